@@ -0,0 +1,67 @@
+from functools import cached_property
+from keyword_matcher import get_matcher
+import nltk_resources
+
+class AnalysisDocument:
+    """Article text plus derived views, each computed at most once and on demand"""
+
+    def __init__(self, text):
+        self.text = text
+
+    @classmethod
+    def wrap(cls, text):
+        """Return text as an AnalysisDocument, reusing it if it already is one"""
+        return text if isinstance(text, cls) else cls(text)
+
+    @cached_property
+    def lower(self):
+        """Lowercased text"""
+        return self.text.lower()
+
+    @cached_property
+    def words(self):
+        """Whitespace-separated tokens"""
+        return self.text.split()
+
+    @cached_property
+    def word_count(self):
+        return len(self.words)
+
+    @cached_property
+    def caps_word_count(self):
+        """All-caps whitespace tokens longer than two characters"""
+        return sum(1 for word in self.words if word.isupper() and len(word) > 2)
+
+    @cached_property
+    def sentences(self):
+        """NLTK sentences, or a naive split on periods without the punkt data"""
+        if not nltk_resources.has_resource('punkt_tab'):
+            return self.text.split('.')
+        from nltk.tokenize import sent_tokenize
+        return sent_tokenize(self.text)
+
+    @cached_property
+    def tokens(self):
+        """NLTK word tokens, or whitespace tokens without the punkt data"""
+        if not nltk_resources.has_resource('punkt_tab'):
+            return self.words
+        from nltk.tokenize import word_tokenize
+        return word_tokenize(self.text)
+
+    @cached_property
+    def caps_token_count(self):
+        """All-caps NLTK tokens longer than two characters"""
+        return sum(1 for token in self.tokens if token.isupper() and len(token) > 2)
+
+    @cached_property
+    def exclamation_count(self):
+        return self.text.count('!')
+
+    @cached_property
+    def question_count(self):
+        return self.text.count('?')
+
+    @cached_property
+    def keyword_matches(self):
+        """Matched terms for every indicator set, from one pass of the shared matcher"""
+        return get_matcher().match(self.lower)
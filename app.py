@@ -25,13 +25,108 @@ app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
     "pool_pre_ping": True,
 }
 
+# Versioned model artifacts published by `flask train-models`
+app.config["MODEL_ARTIFACT_DIR"] = os.environ.get(
+    "MODEL_ARTIFACT_DIR", os.path.join(app.instance_path, "models")
+)
+
+# Seconds between checks for a newly published model version (0 disables hot reloading)
+app.config["MODEL_RELOAD_INTERVAL"] = float(os.environ.get("MODEL_RELOAD_INTERVAL", 60))
+
+# Labeled analyses streamed per partial_fit call by `flask train-incremental`
+app.config["INCREMENTAL_CHUNK_SIZE"] = int(os.environ.get("INCREMENTAL_CHUNK_SIZE", 1000))
+
+# Show an estimated analysis count on /history (no COUNT(*) is ever run)
+app.config["HISTORY_APPROX_TOTAL"] = os.environ.get("HISTORY_APPROX_TOTAL", "1").lower() in ("1", "true", "yes")
+
+# Batch analysis limits: articles accepted per request and rows scored per model call
+app.config["BATCH_MAX_ARTICLES"] = int(os.environ.get("BATCH_MAX_ARTICLES", 500))
+app.config["BATCH_CHUNK_SIZE"] = int(os.environ.get("BATCH_CHUNK_SIZE", 64))
+
+# Longest accepted line (one article) in /batch_analyze/stream request bodies
+app.config["BATCH_STREAM_MAX_LINE_BYTES"] = int(os.environ.get("BATCH_STREAM_MAX_LINE_BYTES", 1024 * 1024))
+
+# Concurrent URL fetching for batch analysis
+app.config["FETCH_MAX_WORKERS"] = int(os.environ.get("FETCH_MAX_WORKERS", 8))
+app.config["FETCH_PER_HOST_LIMIT"] = int(os.environ.get("FETCH_PER_HOST_LIMIT", 2))
+app.config["BATCH_FETCH_DEADLINE"] = float(os.environ.get("BATCH_FETCH_DEADLINE", 30))
+
+# Largest page body downloaded for URL analysis; bigger pages are rejected
+app.config["FETCH_MAX_BYTES"] = int(os.environ.get("FETCH_MAX_BYTES", 5 * 1024 * 1024))
+
+# On-disk HTTP cache for fetched pages (set HTTP_CACHE_PATH to an empty string to disable)
+app.config["HTTP_CACHE_PATH"] = os.environ.get(
+    "HTTP_CACHE_PATH", os.path.join(app.instance_path, "http_cache.sqlite3")
+)
+app.config["HTTP_CACHE_MAX_BYTES"] = int(os.environ.get("HTTP_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+app.config["HTTP_CACHE_TTL"] = int(os.environ.get("HTTP_CACHE_TTL", 3600))
+# Cache hits update an entry's LRU access time at most this often (seconds)
+app.config["HTTP_CACHE_TOUCH_INTERVAL"] = int(os.environ.get("HTTP_CACHE_TOUCH_INTERVAL", 60))
+
+# In-process LRU of analyses keyed by content hash and model version
+app.config["RESULT_CACHE_SIZE"] = int(os.environ.get("RESULT_CACHE_SIZE", 4096))
+
+# Background analysis jobs (POST /jobs): worker threads per process and queue bound
+app.config["JOB_WORKERS"] = int(os.environ.get("JOB_WORKERS", 4))
+app.config["JOB_MAX_QUEUED"] = int(os.environ.get("JOB_MAX_QUEUED", 1000))
+# Running jobs refresh a heartbeat this often; another worker may reclaim a job
+# once its heartbeat is older than JOB_STALE_AFTER seconds
+app.config["JOB_HEARTBEAT_INTERVAL"] = int(os.environ.get("JOB_HEARTBEAT_INTERVAL", 30))
+app.config["JOB_STALE_AFTER"] = int(os.environ.get("JOB_STALE_AFTER", 120))
+
+# Seconds between checks of the TrustedSource table for changed domain reputations
+# (0 loads it once per process)
+app.config["DOMAIN_REPUTATION_REFRESH"] = float(os.environ.get("DOMAIN_REPUTATION_REFRESH", 300))
+
+# Cascaded scoring: skip the random forest when logistic regression and the rules agree
+# and their combined score is at least this far from 0.5 (unset runs the full ensemble)
+app.config["DETECTOR_CASCADE_THRESHOLD"] = (
+    float(os.environ["DETECTOR_CASCADE_THRESHOLD"]) if os.environ.get("DETECTOR_CASCADE_THRESHOLD") else None
+)
+
+# Optional process pool for model scoring (0 processes scores in the request thread)
+app.config["SCORING_PROCESSES"] = int(os.environ.get("SCORING_PROCESSES", 0))
+app.config["SCORING_BATCH_WINDOW_MS"] = float(os.environ.get("SCORING_BATCH_WINDOW_MS", 5))
+app.config["SCORING_MAX_BATCH"] = int(os.environ.get("SCORING_MAX_BATCH", 64))
+
+# Per-process metrics files merged by /metrics across gunicorn workers and scoring
+# processes (set METRICS_DIR to an empty string to report this process only).
+# Clear the directory when deploying so counters of old processes are dropped.
+app.config["METRICS_DIR"] = os.environ.get("METRICS_DIR", os.path.join(app.instance_path, "metrics"))
+app.config["METRICS_FLUSH_INTERVAL"] = float(os.environ.get("METRICS_FLUSH_INTERVAL", 5))
+
+# Opt-in request profiling. When enabled, requests sending PROFILING_HEADER get a
+# Server-Timing header with per-stage durations; a header value of "cprofile" also
+# writes a cProfile dump to PROFILE_DIR. If PROFILING_TOKEN is set, the request must
+# send it in the <PROFILING_HEADER>-Token header.
+app.config["PROFILING_ENABLED"] = os.environ.get("PROFILING_ENABLED", "0").lower() in ("1", "true", "yes")
+app.config["PROFILING_HEADER"] = os.environ.get("PROFILING_HEADER", "X-Profile")
+app.config["PROFILING_TOKEN"] = os.environ.get("PROFILING_TOKEN", "")
+app.config["PROFILE_DIR"] = os.environ.get("PROFILE_DIR", os.path.join(app.instance_path, "profiles"))
+
+# Local NLTK data directory; nothing is downloaded at runtime
+app.config["NLTK_DATA_PATH"] = os.environ.get(
+    "NLTK_DATA", os.path.join(app.instance_path, "nltk_data")
+)
+
 # Initialize the app with the extension
 db.init_app(app)
 
+import nltk_resources
+nltk_resources.configure(app.config["NLTK_DATA_PATH"])
+
+# Registered before the routes so profiling covers the other request hooks
+import profiling
+profiling.install(app)
+
 with app.app_context():
-    # Import models and routes
+    # Import models, routes and CLI commands
     import models
     import routes
+    import cli
     
-    # Create all database tables
+    # Create all database tables and upgrade existing ones
     db.create_all()
+    
+    from migrations import upgrade_schema
+    upgrade_schema()
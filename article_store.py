@@ -0,0 +1,34 @@
+from sqlalchemy import select, insert
+from app import db
+from models import Article
+
+def store_articles(articles):
+    """
+    Store article texts that are not stored yet, in the current transaction.
+    articles maps content hash -> text; texts already present (including ones
+    inserted concurrently by another worker) are left untouched.
+    """
+    if not articles:
+        return
+
+    existing = set(db.session.scalars(
+        select(Article.content_hash).where(Article.content_hash.in_(list(articles)))
+    ))
+    rows = [
+        Article.row_for(content, content_hash)
+        for content_hash, content in articles.items()
+        if content_hash not in existing
+    ]
+    if rows:
+        db.session.execute(_insert_ignoring_duplicates(), rows)
+
+def _insert_ignoring_duplicates():
+    """INSERT into article that skips hashes stored since the existence check"""
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        return insert(Article)
+    return dialect_insert(Article).on_conflict_do_nothing(index_elements=['content_hash'])
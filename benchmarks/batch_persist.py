@@ -0,0 +1,117 @@
+"""
+Throughput of storing /batch_analyze results.
+
+Compares committing one analysis at a time with the bulk path used by
+/batch_analyze (one multi-row INSERT per chunk, one commit per request) on
+prepared rows, so only database writes are timed, then times the whole
+endpoint. Runs against a scratch SQLite database unless DATABASE_URL is set.
+
+    python benchmarks/batch_persist.py --sizes 1000 10000
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+WORDS = (
+    "according officials confirmed report data study published research government "
+    "shocking secret revealed breaking urgent share leaked exposed truth experts "
+    "market economy policy election health climate court city council school"
+).split()
+
+def make_articles(count, seed=42):
+    """Deterministic, mostly distinct article texts of a few hundred words"""
+    rng = random.Random(seed)
+    return [
+        f"Article {i}. " + ' '.join(rng.choice(WORDS) for _ in range(rng.randint(80, 600)))
+        for i in range(count)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000], help='articles per batch')
+    parser.add_argument('--chunk-size', type=int, default=64, help='rows per bulk INSERT')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    scratch_dir = tempfile.mkdtemp(prefix='batch-bench-')
+    os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(scratch_dir, 'bench.sqlite3')}")
+    os.environ.setdefault('MODEL_ARTIFACT_DIR', os.path.join(scratch_dir, 'models'))
+    os.environ['HTTP_CACHE_PATH'] = ''
+    os.environ['BATCH_MAX_ARTICLES'] = str(max(args.sizes))
+    os.environ['BATCH_CHUNK_SIZE'] = str(args.chunk_size)
+    logging.disable(logging.WARNING)
+
+    from app import app, db
+    from models import Analysis
+    from analysis_document import AnalysisDocument
+    from article_store import store_articles
+    from pipeline import detector, prepare_analyses, save_analyses
+
+    results = []
+    with app.app_context():
+        detector.version  # load or train the models outside the timings
+        client = app.test_client()
+
+        for size in args.sizes:
+            texts = make_articles(size, seed=size)
+            docs = [AnalysisDocument(text) for text in texts]
+            scores = [(0.5, 'full')] * size
+
+            rows = prepare_analyses(docs, [None] * size, scores)
+
+            # One INSERT and commit per analysis
+            start = time.perf_counter()
+            for text, row in zip(texts, rows):
+                store_articles({row['content_hash']: text})
+                db.session.add(Analysis(**row))
+                db.session.commit()
+            per_row = time.perf_counter() - start
+
+            # Bulk path: one multi-row INSERT per chunk, one commit
+            texts = [text + ' bulk' for text in texts]
+            rows = prepare_analyses([AnalysisDocument(text) for text in texts], [None] * size, scores)
+            start = time.perf_counter()
+            for offset in range(0, size, args.chunk_size):
+                chunk = slice(offset, offset + args.chunk_size)
+                save_analyses(texts[chunk], rows[chunk])
+            db.session.commit()
+            bulk = time.perf_counter() - start
+
+            # The whole endpoint, including scoring
+            payload = {'articles': [{'content': text + ' endpoint'} for text in texts]}
+            start = time.perf_counter()
+            response = client.post('/batch_analyze', json=payload)
+            endpoint = time.perf_counter() - start
+            stored = len(response.get_json()['results'])
+
+            results.append({
+                'articles': size,
+                'per_row_commit_per_s': round(size / per_row),
+                'bulk_insert_per_s': round(size / bulk),
+                'endpoint_per_s': round(stored / endpoint),
+                'endpoint_stored': stored
+            })
+
+    shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'articles':>9}{'per-row commit/s':>18}{'bulk insert/s':>15}{'speedup':>9}{'endpoint/s':>12}")
+    for result in results:
+        speedup = result['bulk_insert_per_s'] / result['per_row_commit_per_s']
+        print(f"{result['articles']:>9}{result['per_row_commit_per_s']:>18}{result['bulk_insert_per_s']:>15}"
+              f"{speedup:>8.1f}x{result['endpoint_per_s']:>12}")
+
+if __name__ == '__main__':
+    main()
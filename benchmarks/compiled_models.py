@@ -0,0 +1,71 @@
+"""
+Compare the compiled flat-array models against sklearn's predict_proba.
+
+Trains the detector in-process, vectorizes a deterministic synthetic corpus
+and times each model for single-row and batch calls, checking that the
+compiled scores are bit-identical to sklearn's.
+
+    python benchmarks/compiled_models.py --rows 1000 --repeat 50
+"""
+import argparse
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml_models import FakeNewsDetector
+from compiled_models import compile_models
+
+def make_texts(vocabulary, count, seed=42):
+    """Deterministic texts drawn from the vectorizer vocabulary"""
+    rng = random.Random(seed)
+    words = sorted({word for term in vocabulary for word in term.split()})
+    return [' '.join(rng.choice(words) for _ in range(rng.randint(20, 400))) for _ in range(count)]
+
+def time_call(func, repeat):
+    """Median wall time of func in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000, help='Rows in the batch case')
+    parser.add_argument('--repeat', type=int, default=50, help='Timed calls per case')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    detector = FakeNewsDetector(use_compiled=False)
+    detector.train()
+    compiled = compile_models(detector.models)
+
+    X = detector.vectorizer.transform(make_texts(detector.vectorizer.vocabulary_, args.rows))
+    cases = [('1 row', X[:1], args.repeat), (f'{args.rows} rows', X, max(3, args.repeat // 10))]
+
+    identical = True
+    print(f"{'model':<15} {'case':<12} {'sklearn ms':>11} {'compiled ms':>12} {'speedup':>8}  identical")
+    for name, model in detector.models.items():
+        for label, rows, repeat in cases:
+            expected = model.predict_proba(rows)
+            actual = compiled[name].predict_proba(rows)
+            same = np.array_equal(expected, actual)
+            identical &= same
+
+            sklearn_ms = time_call(lambda: model.predict_proba(rows), repeat)
+            compiled_ms = time_call(lambda: compiled[name].predict_proba(rows), repeat)
+            print(f"{name:<15} {label:<12} {sklearn_ms:11.3f} {compiled_ms:12.3f} "
+                  f"{sklearn_ms / compiled_ms:7.1f}x  {same}")
+
+    return 0 if identical else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,280 @@
+"""
+End-to-end load test of the app under gunicorn, with no external sites.
+
+Starts a local stand-in news server that serves canned article HTML with
+configurable latency and page size. It then starts the app under gunicorn on
+a scratch database, which is trained up front so workers only load models.
+Each scenario runs at each concurrency level for --duration seconds with
+closed-loop clients. The scenarios are /analyze with text, /analyze with a URL
+on the stand-in server, /batch_analyze and /history. The report gives
+requests per second, p50/p95/p99 latency and the error rate.
+
+    python benchmarks/load_test.py --concurrency 1 4 16 --duration 15 --workers 4
+    python benchmarks/load_test.py --target http://127.0.0.1:5000 --scenarios history
+
+SQLite serializes writes, so write-heavy scenarios at high concurrency mostly
+measure its locking; set DATABASE_URL to a PostgreSQL database to size a fleet.
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import requests
+
+from suite import make_article, make_page
+
+SCENARIOS = ['analyze_text', 'analyze_url', 'batch_analyze', 'history']
+
+class StandInNewsServer:
+    """Threaded HTTP server answering every GET with one of a few canned article pages"""
+
+    def __init__(self, latency_ms=50, jitter_ms=0, page_kb=30, pages=16, seed=42):
+        rng = random.Random(seed)
+        self.pages = [make_page(rng, make_article(rng, page_kb * 1024)) for _ in range(pages)]
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.requests_served = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                delay = server.latency + (random.uniform(-server.jitter, server.jitter) if server.jitter else 0)
+                if delay > 0:
+                    time.sleep(delay)
+                page = server.pages[hash(self.path) % len(server.pages)]
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(page)))
+                self.send_header('Cache-Control', 'no-store')
+                self.end_headers()
+                self.wfile.write(page)
+                server.requests_served += 1
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.httpd.server_address[1]}'
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, name='stand-in-news', daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def start_gunicorn(scratch_dir, workers, threads):
+    """Train models once, then start gunicorn on a scratch database; returns (process, base url, log path)"""
+    env = dict(os.environ)
+    env.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(scratch_dir, 'load.sqlite3')}")
+    env.setdefault('MODEL_ARTIFACT_DIR', os.path.join(scratch_dir, 'models'))
+    env.setdefault('METRICS_DIR', os.path.join(scratch_dir, 'metrics'))
+    # Every URL request should reach the stand-in server
+    env['HTTP_CACHE_PATH'] = ''
+
+    subprocess.run([sys.executable, '-m', 'flask', '--app', 'main', 'train-models'], cwd=REPO_ROOT, env=env,
+                   check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    port = free_port()
+    log_path = os.path.join(scratch_dir, 'gunicorn.log')
+    with open(log_path, 'w') as log:
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '--workers', str(workers), '--threads', str(threads),
+             '--timeout', '120', '--bind', f'127.0.0.1:{port}', 'main:app'],
+            cwd=REPO_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT
+        )
+    return process, f'http://127.0.0.1:{port}', log_path
+
+def wait_until_ready(base_url, process=None, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError('gunicorn exited during startup')
+        try:
+            if requests.get(f'{base_url}/', timeout=2).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f'{base_url} did not become ready within {timeout}s')
+
+class RequestFactory:
+    """Builds each scenario's requests; contents and URLs are unique so no stored result is reused"""
+
+    def __init__(self, base_url, news_url, batch_size, seed=7):
+        rng = random.Random(seed)
+        self.articles = [make_article(rng, rng.choice([800, 3000, 12000])) for _ in range(32)]
+        self.base_url = base_url
+        self.news_url = news_url
+        self.batch_size = batch_size
+        self._counter = itertools.count()
+
+    def _content(self):
+        n = next(self._counter)
+        return f'{self.articles[n % len(self.articles)]} [load {n}]'
+
+    def send(self, session, scenario):
+        """Perform one request; returns (ok, error label or None, items processed)"""
+        if scenario == 'analyze_text':
+            response = session.post(f'{self.base_url}/analyze', data={'content': self._content()},
+                                    allow_redirects=False, timeout=120)
+            # Failures redirect back to the form with a flash message
+            return response.status_code == 200, None if response.status_code == 200 else str(response.status_code), 1
+        if scenario == 'analyze_url':
+            url = f'{self.news_url}/article/{next(self._counter)}'
+            response = session.post(f'{self.base_url}/analyze', data={'url': url},
+                                    allow_redirects=False, timeout=120)
+            return response.status_code == 200, None if response.status_code == 200 else str(response.status_code), 1
+        if scenario == 'batch_analyze':
+            payload = {'articles': [{'content': self._content()} for _ in range(self.batch_size)]}
+            response = session.post(f'{self.base_url}/batch_analyze', json=payload, timeout=300)
+            if response.status_code != 200:
+                return False, str(response.status_code), 0
+            stored = len(response.json().get('results', []))
+            return stored == self.batch_size, None if stored == self.batch_size else 'partial', stored
+        if scenario == 'history':
+            response = session.get(f'{self.base_url}/history', allow_redirects=False, timeout=60)
+            return response.status_code == 200, None if response.status_code == 200 else str(response.status_code), 1
+        raise ValueError(f'Unknown scenario {scenario}')
+
+def run_level(factory, scenario, concurrency, duration):
+    """Closed-loop clients sending scenario requests for duration seconds"""
+    deadline = time.monotonic() + duration
+    lock = threading.Lock()
+    latencies, errors, items = [], {}, [0]
+
+    def client():
+        session = requests.Session()
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                ok, error, processed = factory.send(session, scenario)
+            except requests.RequestException as e:
+                ok, error, processed = False, type(e).__name__, 0
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                items[0] += processed
+                if not ok:
+                    errors[error] = errors.get(error, 0) + 1
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for _ in range(concurrency):
+            executor.submit(client)
+    wall = time.monotonic() - started
+
+    latencies.sort()
+    count = len(latencies)
+
+    def percentile(fraction):
+        return round(latencies[min(count - 1, max(0, round(fraction * count) - 1))] * 1000, 1) if count else None
+
+    return {
+        'scenario': scenario,
+        'concurrency': concurrency,
+        'requests': count,
+        'rps': round(count / wall, 1),
+        'items_per_s': round(items[0] / wall, 1),
+        'p50_ms': percentile(0.50),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 1) if count else None,
+        'error_rate': round(sum(errors.values()) / count, 4) if count else 0.0,
+        'errors': errors,
+    }
+
+def print_row(result):
+    errors = ', '.join(f'{label}:{n}' for label, n in sorted(result['errors'].items()))
+    print(f"{result['scenario']:<15}{result['concurrency']:>5}{result['requests']:>9}{result['rps']:>9.1f}"
+          f"{result['items_per_s']:>10.1f}{result['p50_ms'] or 0:>10.1f}{result['p95_ms'] or 0:>10.1f}"
+          f"{result['p99_ms'] or 0:>10.1f}{result['error_rate']:>8.1%}  {errors}", flush=True)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16], help='concurrent clients per level')
+    parser.add_argument('--duration', type=float, default=10, help='seconds per scenario and level')
+    parser.add_argument('--warmup', type=float, default=2, help='unreported seconds before each scenario')
+    parser.add_argument('--workers', type=int, default=4, help='gunicorn worker processes')
+    parser.add_argument('--threads', type=int, default=4, help='threads per gunicorn worker')
+    parser.add_argument('--target', help='base URL of an already running app instead of starting gunicorn')
+    parser.add_argument('--batch-size', type=int, default=20, help='articles per /batch_analyze request')
+    parser.add_argument('--news-latency-ms', type=float, default=50, help='stand-in news server response delay')
+    parser.add_argument('--news-jitter-ms', type=float, default=0, help='random +/- variation of the delay')
+    parser.add_argument('--news-page-kb', type=int, default=30, help='approximate article text per canned page')
+    parser.add_argument('--json', dest='json_path', help='write the results to this file')
+    args = parser.parse_args()
+
+    news = StandInNewsServer(args.news_latency_ms, args.news_jitter_ms, args.news_page_kb).start()
+    scratch_dir = tempfile.mkdtemp(prefix='load-test-')
+    process = None
+    results = []
+    try:
+        if args.target:
+            base_url = args.target.rstrip('/')
+            wait_until_ready(base_url)
+        else:
+            process, base_url, log_path = start_gunicorn(scratch_dir, args.workers, args.threads)
+            try:
+                wait_until_ready(base_url, process)
+            except RuntimeError:
+                with open(log_path) as f:
+                    print(f.read()[-3000:], file=sys.stderr)
+                raise
+
+        print(f"app {base_url}, stand-in news server {news.url} "
+              f"({args.news_page_kb} KB pages, {args.news_latency_ms:.0f} ms latency)")
+        print(f"{'scenario':<15}{'conc':>5}{'requests':>9}{'rps':>9}{'items/s':>10}"
+              f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+
+        factory = RequestFactory(base_url, news.url, args.batch_size)
+        for scenario in args.scenarios:
+            if args.warmup > 0:
+                run_level(factory, scenario, min(args.concurrency), args.warmup)
+            for concurrency in args.concurrency:
+                result = run_level(factory, scenario, concurrency, args.duration)
+                results.append(result)
+                print_row(result)
+    finally:
+        if process is not None:
+            process.terminate()
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        news.stop()
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({
+                'config': {key: value for key, value in vars(args).items() if key != 'json_path'},
+                'results': results,
+            }, f, indent=2)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
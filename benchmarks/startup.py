@@ -0,0 +1,111 @@
+"""
+Startup budget check for the web app.
+
+Imports `app` in a fresh interpreter under `python -X importtime`, reports the
+cumulative import time and the slowest top-level packages, and fails when the
+median over several runs exceeds the budget or when a heavy dependency that
+should load lazily is imported at startup.
+
+    python benchmarks/startup.py --budget-ms 1000 --runs 5 --json startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dependencies that must only be imported on first use
+LAZY_PACKAGES = ['sklearn', 'scipy', 'pandas', 'nltk', 'trafilatura', 'bs4', 'joblib']
+
+def run_importtime(workdir):
+    """Import app once and return parsed (self_us, cumulative_us, depth, module) rows"""
+    env = dict(os.environ)
+    env.update({
+        'DATABASE_URL': f"sqlite:///{os.path.join(workdir, 'startup.db')}",
+        'MODEL_ARTIFACT_DIR': os.path.join(workdir, 'models'),
+        'HTTP_CACHE_PATH': os.path.join(workdir, 'http_cache.sqlite3'),
+        'NLTK_DATA': os.path.join(workdir, 'nltk_data'),
+    })
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing app failed:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(self_us), int(cumulative_us), depth, name.strip()))
+    return rows
+
+def summarize(rows):
+    """Total app import time plus self time grouped by top-level package"""
+    total_us = next(cumulative for _, cumulative, _, name in rows if name == 'app')
+    by_package = defaultdict(int)
+    for self_us, _, _, name in rows:
+        by_package[name.split('.')[0]] += self_us
+    imported = {name.split('.')[0] for _, _, _, name in rows}
+    return total_us / 1000, by_package, imported
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--budget-ms', type=float, default=1000, help='Maximum median import time for app')
+    parser.add_argument('--runs', type=int, default=3, help='Number of fresh-interpreter runs')
+    parser.add_argument('--top', type=int, default=15, help='Number of packages to list')
+    parser.add_argument('--json', dest='json_path', help='Write the report to this file')
+    args = parser.parse_args()
+
+    totals = []
+    packages = defaultdict(list)
+    imported = set()
+    with tempfile.TemporaryDirectory() as workdir:
+        # Warm-up run so bytecode compilation is not counted
+        run_importtime(workdir)
+        for _ in range(args.runs):
+            total_ms, by_package, run_imported = summarize(run_importtime(workdir))
+            totals.append(total_ms)
+            imported |= run_imported
+            for package, self_us in by_package.items():
+                packages[package].append(self_us / 1000)
+
+    median_ms = statistics.median(totals)
+    slowest = sorted(
+        ((package, statistics.median(times)) for package, times in packages.items()),
+        key=lambda item: item[1], reverse=True
+    )[:args.top]
+    eager_heavy = sorted(package for package in LAZY_PACKAGES if package in imported)
+
+    print(f"app import: median {median_ms:.1f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+    print("slowest packages (self time):")
+    for package, ms in slowest:
+        print(f"  {package:<30} {ms:8.1f} ms")
+    if eager_heavy:
+        print(f"heavy packages imported at startup: {', '.join(eager_heavy)}")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({
+                'median_ms': median_ms,
+                'runs_ms': totals,
+                'budget_ms': args.budget_ms,
+                'slowest_packages_ms': dict(slowest),
+                'eager_heavy_packages': eager_heavy,
+            }, f, indent=2)
+
+    if median_ms > args.budget_ms or eager_heavy:
+        print("FAIL: startup budget exceeded")
+        return 1
+    print("OK")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,201 @@
+"""
+Measure database size and row-fetch latency before and after moving article
+bodies into the compressed, content-addressed article table.
+
+Builds an SQLite database with the legacy analysis schema (full TEXT content
+per row, TEXT analysis_details) from a deterministic corpus in which some
+articles are analyzed more than once, then upgrades a copy with the app's own
+migration and compares the two.
+
+    python benchmarks/storage.py --analyses 5000 --duplicate-ratio 0.3
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from datetime import datetime, timedelta
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LEGACY_SCHEMA = """
+CREATE TABLE analysis (
+    id INTEGER NOT NULL PRIMARY KEY,
+    content TEXT NOT NULL,
+    url VARCHAR(500),
+    credibility_score FLOAT NOT NULL,
+    is_fake BOOLEAN NOT NULL,
+    keyword_score FLOAT,
+    sentiment_score FLOAT,
+    source_score FLOAT,
+    analysis_details TEXT,
+    created_at DATETIME
+)
+"""
+
+def make_article(rng, vocabulary, cum_weights):
+    """Deterministic article of 2-20 KB with a Zipf-like word distribution"""
+    target = rng.randint(2000, 20000)
+    sentences = []
+    size = 0
+    while size < target:
+        words = rng.choices(vocabulary, cum_weights=cum_weights, k=rng.randint(8, 25))
+        sentence = ' '.join(words).capitalize() + '.'
+        sentences.append(sentence)
+        size += len(sentence) + 1
+    return ' '.join(sentences)
+
+def build_legacy_database(path, analyses, duplicate_ratio, seed=42):
+    """Legacy-schema database where duplicate_ratio of analyses repeat an earlier article"""
+    rng = random.Random(seed)
+    vocabulary = [''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(2, 10)))
+                  for _ in range(3000)]
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocabulary))))
+    articles = []
+    started = datetime(2024, 1, 1)
+
+    conn = sqlite3.connect(path)
+    conn.execute(LEGACY_SCHEMA)
+    rows = []
+    for i in range(analyses):
+        if articles and rng.random() < duplicate_ratio:
+            content = rng.choice(articles)
+        else:
+            content = make_article(rng, vocabulary, cum_weights)
+            articles.append(content)
+        score = rng.random()
+        details = {
+            'keyword_indicators': rng.sample(vocabulary, 3),
+            'sentiment': rng.choice(['positive', 'negative', 'neutral']),
+            'sentiment_confidence': rng.random(),
+            'readability': {'avg_sentence_length': rng.uniform(8, 30), 'complexity_score': rng.random()},
+            'length': len(content),
+            'word_count': content.count(' ') + 1,
+            'timestamp': (started + timedelta(minutes=i)).isoformat()
+        }
+        rows.append((i + 1, content, None, score, score < 0.5, rng.random(), rng.random(), 0.5,
+                     json.dumps(details), (started + timedelta(minutes=i)).isoformat(sep=' ')))
+    conn.executemany("INSERT INTO analysis VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+    return len(articles)
+
+def migrate(path, scratch_dir):
+    """Upgrade the database in a fresh interpreter through the app's startup migration"""
+    env = dict(os.environ)
+    env.update({
+        'DATABASE_URL': f'sqlite:///{path}',
+        'MODEL_ARTIFACT_DIR': os.path.join(scratch_dir, 'models'),
+        'HTTP_CACHE_PATH': '',
+    })
+    started = time.perf_counter()
+    subprocess.run([sys.executable, '-c', 'import app'], cwd=REPO_ROOT, env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+def database_size(path):
+    """File size in bytes after VACUUM, so freed pages are not counted"""
+    conn = sqlite3.connect(path)
+    conn.execute("VACUUM")
+    conn.close()
+    return os.path.getsize(path)
+
+def time_fetches(path, fetch, ids, repeat=3):
+    """Median per-call latency of fetch(conn, id) in microseconds"""
+    conn = sqlite3.connect(path)
+    timings = []
+    for _ in range(repeat):
+        for analysis_id in ids:
+            start = time.perf_counter()
+            fetch(conn, analysis_id)
+            timings.append((time.perf_counter() - start) * 1e6)
+    conn.close()
+    return statistics.median(timings)
+
+def legacy_row(conn, analysis_id):
+    content, details = conn.execute(
+        "SELECT content, analysis_details FROM analysis WHERE id = ?", (analysis_id,)
+    ).fetchone()
+    return content, json.loads(details)
+
+def article_row(conn, analysis_id):
+    body, details = conn.execute(
+        "SELECT article.body, analysis.analysis_details FROM analysis "
+        "JOIN article ON article.content_hash = analysis.content_hash WHERE analysis.id = ?",
+        (analysis_id,)
+    ).fetchone()
+    return zlib.decompress(body).decode('utf-8'), json.loads(details)
+
+def legacy_list(conn, analysis_id):
+    # The history list used to load every column of each row
+    return conn.execute(
+        "SELECT * FROM analysis WHERE id <= ? ORDER BY id DESC LIMIT 10", (analysis_id,)
+    ).fetchall()
+
+def article_list(conn, analysis_id):
+    return conn.execute(
+        "SELECT analysis.id, analysis.credibility_score, analysis.created_at, "
+        "(SELECT preview FROM article WHERE article.content_hash = analysis.content_hash) "
+        "FROM analysis WHERE id <= ? ORDER BY id DESC LIMIT 10", (analysis_id,)
+    ).fetchall()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--analyses', type=int, default=5000, help='analysis rows to generate')
+    parser.add_argument('--duplicate-ratio', type=float, default=0.3,
+                        help='fraction of analyses that repeat an earlier article')
+    parser.add_argument('--fetches', type=int, default=1000, help='random rows fetched per measurement')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    scratch_dir = tempfile.mkdtemp(prefix='storage-bench-')
+    try:
+        legacy_path = os.path.join(scratch_dir, 'legacy.sqlite3')
+        upgraded_path = os.path.join(scratch_dir, 'upgraded.sqlite3')
+        distinct = build_legacy_database(legacy_path, args.analyses, args.duplicate_ratio)
+        shutil.copy(legacy_path, upgraded_path)
+
+        migration_seconds = migrate(upgraded_path, scratch_dir)
+
+        rng = random.Random(7)
+        ids = [rng.randint(1, args.analyses) for _ in range(args.fetches)]
+        results = {
+            'analyses': args.analyses,
+            'distinct_articles': distinct,
+            'migration_seconds': round(migration_seconds, 2),
+            'size_bytes': {'before': database_size(legacy_path), 'after': database_size(upgraded_path)},
+            'row_fetch_us': {
+                'before': round(time_fetches(legacy_path, legacy_row, ids), 1),
+                'after': round(time_fetches(upgraded_path, article_row, ids), 1)
+            },
+            'list_fetch_us': {
+                'before': round(time_fetches(legacy_path, legacy_list, ids), 1),
+                'after': round(time_fetches(upgraded_path, article_list, ids), 1)
+            }
+        }
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{results['analyses']} analyses, {results['distinct_articles']} distinct articles, "
+          f"migrated in {results['migration_seconds']}s")
+    print(f"{'metric':<26}{'before':>14}{'after':>14}{'change':>10}")
+    for label, key, unit in [('database size', 'size_bytes', 'B'),
+                             ('full row fetch', 'row_fetch_us', 'us'),
+                             ('10-row list fetch', 'list_fetch_us', 'us')]:
+        before, after = results[key]['before'], results[key]['after']
+        print(f"{label:<26}{before:>12,.0f}{unit:>2}{after:>12,.0f}{unit:>2}{(after - before) / before:>+10.0%}")
+
+if __name__ == '__main__':
+    main()
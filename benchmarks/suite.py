@@ -0,0 +1,329 @@
+"""
+Component benchmarks for FakeNewsDetector, TextAnalyzer and URLExtractor.
+
+Times predict_credibility, every analyze_* method, extract_entities and HTML
+extraction of canned pages over a deterministic synthetic corpus of short
+(~300 B) to 100 KB articles. For each case it reports latency percentiles,
+throughput and peak traced memory. Pass --output to save the results as a
+JSON baseline. Pass --compare with a baseline from the same machine to flag
+cases whose median latency or peak memory regressed by more than --threshold.
+
+    python benchmarks/suite.py --output benchmarks/baseline.json
+    python benchmarks/suite.py --compare benchmarks/baseline.json --threshold 0.15
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+# Article size classes: name -> (approximate bytes, articles generated)
+SIZE_CLASSES = {
+    'short': (300, 40),
+    'medium': (3000, 20),
+    'long': (20000, 8),
+    'xl': (100000, 3),
+}
+
+WORDS = (
+    "the of and to in a is that for on with as by at from it was be this are have has "
+    "officials said report city council market economy policy election health climate "
+    "court school students police hospital budget tax energy water housing transport "
+    "week year month people government president minister company workers prices "
+    "announced expected according increase decline local national international"
+).split()
+
+PHRASES = [
+    'according to', 'study shows', 'research indicates', 'data suggests', 'reuters',
+    'associated press', 'peer-reviewed', 'university', 'published in', 'investigation',
+    'breaking', 'shocking', 'bombshell', 'exposed', 'leaked', 'secret', 'conspiracy',
+    'cover-up', "you won't believe", 'mainstream media', 'wake up', 'confirmed', 'evidence',
+]
+
+ENTITIES = [
+    'Acme Corp', 'Northwind Institute', 'Riverside University', 'Springfield City',
+    'Lake County', 'Ontario Province', 'March 3, 2024', '12/05/2023', '2024-01-15',
+]
+
+URLS = [
+    'https://www.reuters.com/world/article-1',
+    'https://edition.cnn.com/2024/01/01/politics/story',
+    'https://news.example-blog.net/shocking-truth',
+    'http://192.168.1.20/news',
+    'https://breaking-news-today.info/urgent',
+    'https://www.bbc.co.uk/news/world-123',
+]
+
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html lang="en"><head>
+<meta charset="utf-8"><title>{title}</title>
+<meta name="description" content="{description}">
+<meta name="author" content="Staff Reporter">
+<meta property="og:title" content="{title}">
+<meta property="article:published_time" content="2024-03-03T10:00:00Z">
+<script>window.analytics = {{"id": 12345, "events": []}};</script>
+<style>body {{ font-family: sans-serif; }} .nav a {{ margin: 4px; }}</style>
+</head><body>
+<nav class="nav">{nav}</nav>
+<header><h1>{title}</h1><p class="byline">By Staff Reporter</p></header>
+<article class="article-content">{paragraphs}</article>
+<aside class="related">{related}</aside>
+<footer><p>Copyright 2024 Example News. All rights reserved.</p>{nav}</footer>
+</body></html>
+"""
+
+def make_sentence(rng):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(8, 25))]
+    if rng.random() < 0.3:
+        words.insert(rng.randrange(len(words)), rng.choice(PHRASES))
+    if rng.random() < 0.2:
+        words.insert(rng.randrange(len(words)), rng.choice(ENTITIES))
+    if rng.random() < 0.05:
+        words[0] = words[0].upper()
+    return ' '.join(words).capitalize() + rng.choice('..!?.')
+
+def make_article(rng, target_bytes):
+    """Deterministic article of roughly target_bytes in paragraphs of 3-8 sentences"""
+    paragraphs = []
+    size = 0
+    while size < target_bytes:
+        paragraph = ' '.join(make_sentence(rng) for _ in range(rng.randint(3, 8)))
+        paragraphs.append(paragraph)
+        size += len(paragraph) + 2
+    return '\n\n'.join(paragraphs)
+
+def make_page(rng, article):
+    """Canned HTML page around an article, with navigation, scripts and meta tags"""
+    nav = ''.join(f'<a href="/section/{i}">{rng.choice(WORDS).title()}</a>' for i in range(12))
+    related = ''.join(f'<p><a href="/story/{i}">{make_sentence(rng)}</a></p>' for i in range(5))
+    paragraphs = ''.join(f'<p>{paragraph}</p>\n' for paragraph in article.split('\n\n'))
+    title = make_sentence(rng)[:80]
+    return HTML_TEMPLATE.format(
+        title=title, description=article[:150].replace('"', "'"), nav=nav,
+        related=related, paragraphs=paragraphs
+    ).encode('utf-8')
+
+def build_corpus(seed=42):
+    """size class -> list of (text, html bytes), identical for a given seed"""
+    rng = random.Random(seed)
+    corpus = {}
+    for name, (target_bytes, count) in SIZE_CLASSES.items():
+        articles = [make_article(rng, target_bytes) for _ in range(count)]
+        corpus[name] = [(article, make_page(rng, article)) for article in articles]
+    return corpus
+
+def build_cases(detector, analyzer, extractor):
+    """
+    Benchmark cases as (name, input kind, function). Inputs are plain strings
+    and fresh documents so no per-document cache carries over between calls.
+    """
+    from url_extractor import FetchedDocument
+
+    return [
+        ('predict_credibility', 'text', detector.predict_credibility),
+        ('analyze_keywords', 'text', analyzer.analyze_keywords),
+        ('analyze_sentiment', 'text', analyzer.analyze_sentiment),
+        ('analyze_readability', 'text', analyzer.analyze_readability),
+        ('extract_entities', 'text', analyzer.extract_entities),
+        ('analyze_source_credibility', 'url', analyzer.analyze_source_credibility),
+        ('html_text', 'html', lambda page: FetchedDocument('https://example.com/a', page, extractor).text),
+        ('html_fallback_text', 'html', extractor._extract_with_beautifulsoup),
+        ('html_metadata', 'html', lambda page: FetchedDocument('https://example.com/a', page, extractor).metadata),
+    ]
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def time_case(func, inputs, sizes, min_time, min_calls, max_calls):
+    """Call func over inputs round-robin for at least min_time seconds and min_calls calls"""
+    func(inputs[0])  # warm-up: lazy imports and resource loading
+    gc.collect()
+
+    latencies = []
+    processed = 0
+    started = time.perf_counter()
+    index = 0
+    while len(latencies) < max_calls and (len(latencies) < min_calls or time.perf_counter() - started < min_time):
+        item = inputs[index % len(inputs)]
+        call_started = time.perf_counter()
+        func(item)
+        latencies.append(time.perf_counter() - call_started)
+        processed += sizes[index % len(inputs)]
+        index += 1
+
+    latencies.sort()
+    busy = sum(latencies)
+    return {
+        'calls': len(latencies),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 4),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 4),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 4),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 4),
+        'calls_per_s': round(len(latencies) / busy, 1),
+        'mb_per_s': round(processed / busy / 1e6, 3),
+    }
+
+def peak_memory(func, inputs):
+    """Peak traced allocation in KB while processing the largest input (timed separately)"""
+    item = max(inputs, key=len)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        func(item)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round((peak - baseline) / 1024, 1)
+
+def environment():
+    """Details that make results comparable only between like runs"""
+    import nltk_resources
+
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'nltk_resources': {
+            name: nltk_resources.has_resource(name) for name in nltk_resources.REQUIRED_RESOURCES
+        },
+    }
+
+def run(args):
+    # Missing NLTK data is reported once in the environment instead of logged per case
+    logging.disable(logging.CRITICAL)
+
+    import nltk_resources
+    nltk_resources.configure(os.environ.get('NLTK_DATA', os.path.join(REPO_ROOT, 'instance', 'nltk_data')))
+
+    from ml_models import FakeNewsDetector
+    from text_analyzer import TextAnalyzer
+    from url_extractor import URLExtractor
+
+    # Trained in-process from the fixed synthetic corpus unless a bundle is given
+    detector = FakeNewsDetector(artifact_dir=args.artifact_dir, auto_export=False)
+    detector._ensure_models()
+    analyzer = TextAnalyzer()
+    extractor = URLExtractor()
+
+    corpus = build_corpus(args.seed)
+    results = {}
+    for name, kind, func in build_cases(detector, analyzer, extractor):
+        if args.filter and not any(pattern in name for pattern in args.filter):
+            continue
+
+        if kind == 'url':
+            groups = {'urls': URLS}
+        else:
+            groups = {
+                size: [text if kind == 'text' else page for text, page in articles]
+                for size, articles in corpus.items()
+            }
+
+        for size, inputs in groups.items():
+            sizes = [len(item.encode('utf-8')) if isinstance(item, str) else len(item) for item in inputs]
+            result = time_case(func, inputs, sizes, args.min_time, args.min_calls, args.max_calls)
+            result['input_bytes'] = round(statistics.fmean(sizes))
+            result['peak_kb'] = peak_memory(func, inputs)
+            key = f'{name}/{size}'
+            results[key] = result
+            if not args.json:
+                print(f"{key:<36}{result['p50_ms']:>10.3f}{result['p95_ms']:>10.3f}{result['p99_ms']:>10.3f}"
+                      f"{result['calls_per_s']:>12.1f}{result['mb_per_s']:>11.2f}{result['peak_kb']:>11.1f}",
+                      flush=True)
+
+    return {
+        'created_at': datetime.utcnow().isoformat(),
+        'environment': environment(),
+        'config': {'seed': args.seed, 'min_time': args.min_time, 'model_version': detector.version},
+        'results': results,
+    }
+
+def compare(report, baseline, threshold, min_delta_ms):
+    """
+    Compare median latency and peak memory of each case with a baseline
+    Returns: list of regressed case keys
+    """
+    if baseline.get('environment') != report['environment']:
+        print("warning: baseline was recorded in a different environment; differences may not be meaningful")
+
+    regressions = []
+    print(f"\n{'case':<36}{'p50 base':>10}{'p50 now':>10}{'change':>9}{'peak base':>11}{'peak now':>10}  status")
+    for key, current in report['results'].items():
+        previous = baseline.get('results', {}).get(key)
+        if previous is None:
+            print(f"{key:<36}{'':>10}{current['p50_ms']:>10.3f}{'':>9}{'':>11}{current['peak_kb']:>10.1f}  new")
+            continue
+
+        latency_change = current['p50_ms'] / previous['p50_ms'] - 1 if previous['p50_ms'] else 0.0
+        memory_change = current['peak_kb'] / previous['peak_kb'] - 1 if previous['peak_kb'] else 0.0
+        # Ignore relative changes on cases too fast for the difference to matter
+        slower = latency_change > threshold and current['p50_ms'] - previous['p50_ms'] > min_delta_ms
+        bigger = memory_change > threshold and current['peak_kb'] - previous['peak_kb'] > 64
+
+        if slower or bigger:
+            status = 'REGRESSION' + (' (latency)' if slower else '') + (' (memory)' if bigger else '')
+            regressions.append(key)
+        elif latency_change < -threshold:
+            status = 'faster'
+        else:
+            status = 'ok'
+        print(f"{key:<36}{previous['p50_ms']:>10.3f}{current['p50_ms']:>10.3f}{latency_change:>+9.0%}"
+              f"{previous['peak_kb']:>11.1f}{current['peak_kb']:>10.1f}  {status}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seed', type=int, default=42, help='corpus seed')
+    parser.add_argument('--min-time', type=float, default=1.0, help='minimum seconds timed per case and size')
+    parser.add_argument('--min-calls', type=int, default=10, help='minimum calls per case and size')
+    parser.add_argument('--max-calls', type=int, default=2000, help='maximum calls per case and size')
+    parser.add_argument('--filter', nargs='+', help='only run cases whose name contains one of these')
+    parser.add_argument('--artifact-dir', help='benchmark a published model bundle instead of in-process training')
+    parser.add_argument('--output', help='write the results to this JSON file (e.g. a new baseline)')
+    parser.add_argument('--compare', help='baseline JSON file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.15, help='relative slowdown or growth counted as a regression')
+    parser.add_argument('--min-delta-ms', type=float, default=0.05,
+                        help='absolute p50 slowdown below which a case is never a regression')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    if not args.json:
+        print(f"{'case':<36}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'calls/s':>12}{'MB/s':>11}{'peak KB':>11}")
+    report = run(args)
+    missing = [name for name, present in report['environment']['nltk_resources'].items() if not present]
+    if missing and not args.json:
+        print(f"note: NLTK resources missing ({', '.join(missing)}); dependent cases measure the fallbacks")
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"FAIL: {len(regressions)} regressed case(s): {', '.join(regressions)}")
+            return 1
+        print("OK: no regressions")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
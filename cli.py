@@ -0,0 +1,163 @@
+import csv
+import os
+import time
+import click
+from sqlalchemy import select, func, delete
+from app import app, db
+from models import Analysis, Article, TrustedSource
+from ml_models import FakeNewsDetector, train_and_export, IncrementalTrainer
+from rescoring import rescore_analyses
+from domain_reputation import import_trusted_sources
+import nltk_resources
+
+@app.cli.command('train-models')
+@click.option('--artifact-dir', default=None,
+              help='Directory to publish the bundle to (defaults to MODEL_ARTIFACT_DIR).')
+def train_models(artifact_dir):
+    """Train the detector and publish a new versioned artifact bundle"""
+    artifact_dir = artifact_dir or app.config['MODEL_ARTIFACT_DIR']
+    version = train_and_export(artifact_dir)
+    click.echo(f"Published model version {version} to {artifact_dir}")
+
+@app.cli.command('train-incremental')
+@click.option('--artifact-dir', default=None,
+              help='Directory to publish the bundle to (defaults to MODEL_ARTIFACT_DIR).')
+@click.option('--chunk-size', default=None, type=int,
+              help='Labeled analyses per partial_fit call (defaults to INCREMENTAL_CHUNK_SIZE).')
+@click.option('--epochs', default=1, show_default=True, help='Passes over the new labeled analyses.')
+@click.option('--warm-start/--from-scratch', default=True, show_default=True,
+              help='Continue the latest incremental version, or retrain over every labeled analysis.')
+@click.option('--allow-empty', is_flag=True,
+              help='Publish even when no labeled analyses were trained (the models then only know the seed data).')
+def train_incremental(artifact_dir, chunk_size, epochs, warm_start, allow_empty):
+    """Train hashed-feature models on labeled analyses and publish a new version"""
+    artifact_dir = artifact_dir or app.config['MODEL_ARTIFACT_DIR']
+    chunk_size = chunk_size or app.config['INCREMENTAL_CHUNK_SIZE']
+    
+    trainer = IncrementalTrainer(artifact_dir, warm_start=warm_start)
+    start_id = trainer.last_analysis_id
+    # Rows labeled while training are left for the next run
+    end_id = db.session.scalar(select(func.max(Analysis.id)).where(Analysis.label.isnot(None))) or 0
+    
+    trained = 0
+    for _ in range(max(1, epochs)):
+        for ids, texts, labels in _labeled_chunks(start_id, end_id, chunk_size):
+            trainer.partial_fit(texts, labels, last_analysis_id=ids[-1])
+            trained += len(ids)
+    
+    if trained == 0 and warm_start and trainer.base_version:
+        click.echo(f"No new labeled analyses since version {trainer.base_version}")
+        return
+    
+    if trained == 0 and not allow_empty:
+        # Would replace the serving models with ones fitted only on the seed data
+        click.echo("No labeled analyses to train on; nothing published (use --allow-empty to publish anyway)")
+        return
+    
+    version = trainer.publish()
+    click.echo(f"Trained on {trained} labeled analyses; published model version {version} to {artifact_dir}")
+
+def _labeled_chunks(after_id, end_id, chunk_size):
+    """Yield (ids, texts, labels) for labeled analyses in id order, one chunk in memory at a time"""
+    while after_id < end_id:
+        rows = db.session.execute(
+            select(Analysis.id, Article.body, Analysis.label)
+            .join(Article, Analysis.content_hash == Article.content_hash)
+            .where(Analysis.label.isnot(None))
+            .where(Analysis.id > after_id)
+            .where(Analysis.id <= end_id)
+            .order_by(Analysis.id)
+            .limit(chunk_size)
+        ).all()
+        if not rows:
+            break
+        
+        yield (
+            [row.id for row in rows],
+            [Article.decompress(row.body) for row in rows],
+            [row.label for row in rows]
+        )
+        after_id = rows[-1].id
+
+@app.cli.command('rescore-analyses')
+@click.option('--chunk-size', default=500, show_default=True, help='Rows scored and committed per transaction.')
+@click.option('--checkpoint', default=None,
+              help='Progress file used to resume (defaults to instance/rescore_checkpoint.json).')
+@click.option('--restart', is_flag=True, help='Ignore any saved progress and start from the first row.')
+@click.option('--all', 'include_current', is_flag=True,
+              help='Also re-score analyses already scored by the serving model version.')
+def rescore(chunk_size, checkpoint, restart, include_current):
+    """Recompute stored credibility scores with the published model version"""
+    checkpoint = checkpoint or os.path.join(app.instance_path, 'rescore_checkpoint.json')
+    os.makedirs(os.path.dirname(os.path.abspath(checkpoint)), exist_ok=True)
+    
+    # Pin one version for the whole run instead of hot-reloading mid-way
+    detector = FakeNewsDetector(
+        artifact_dir=app.config['MODEL_ARTIFACT_DIR'],
+        cascade_threshold=app.config['DETECTOR_CASCADE_THRESHOLD']
+    )
+    click.echo(f"Re-scoring analyses with model version {detector.version}")
+    
+    started = time.monotonic()
+    rows = 0
+    for progress in rescore_analyses(detector, checkpoint, chunk_size=chunk_size,
+                                     include_current=include_current, restart=restart):
+        rows += progress['chunk_rows']
+        rate = rows / max(time.monotonic() - started, 1e-9)
+        click.echo(f"Re-scored {progress['rows']} analyses through id {progress['last_id']} ({rate:.0f} rows/s)")
+    
+    elapsed = time.monotonic() - started
+    click.echo(f"Done: {rows} analyses re-scored with model version {detector.version} "
+               f"in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):.0f} rows/s)")
+
+@app.cli.command('import-trusted-sources')
+@click.argument('csv_file', type=click.File('r', encoding='utf-8'))
+@click.option('--batch-size', default=10000, show_default=True, help='Rows upserted per transaction.')
+@click.option('--default-score', default=0.9, show_default=True,
+              help='Trust score for rows that only list a domain.')
+@click.option('--replace', is_flag=True, help='Delete all existing trusted sources first.')
+def import_trusted_sources_command(csv_file, batch_size, default_score, replace):
+    """Load domain,trust_score rows from a CSV file into TrustedSource"""
+    if replace:
+        db.session.execute(delete(TrustedSource))
+        db.session.commit()
+    
+    started = time.monotonic()
+    imported = 0
+    skipped = 0
+    
+    def parse_rows():
+        nonlocal skipped
+        for line_number, row in enumerate(csv.reader(csv_file), start=1):
+            if not row or not row[0].strip() or row[0].lstrip().startswith('#'):
+                continue
+            try:
+                score = float(row[1]) if len(row) > 1 and row[1].strip() else default_score
+            except ValueError:
+                # A header line, or a malformed score
+                if line_number > 1:
+                    skipped += 1
+                continue
+            if not 0 <= score <= 1:
+                skipped += 1
+                continue
+            yield row[0], score
+    
+    for written in import_trusted_sources(parse_rows(), batch_size=batch_size):
+        imported += written
+        rate = imported / max(time.monotonic() - started, 1e-9)
+        click.echo(f"Imported {imported} domains ({rate:.0f} rows/s)")
+    
+    click.echo(f"Done: {imported} domains imported, {skipped} rows skipped "
+               f"in {time.monotonic() - started:.1f}s. Running workers pick them up at their next refresh.")
+
+@app.cli.command('download-nltk-data')
+@click.option('--data-dir', default=None,
+              help='Directory to download into (defaults to NLTK_DATA_PATH).')
+def download_nltk_data(data_dir):
+    """Download the NLTK resources used for sentiment and tokenization"""
+    data_dir = data_dir or app.config['NLTK_DATA_PATH']
+    failed = nltk_resources.download(data_dir)
+    if failed:
+        raise click.ClickException(f"Failed to download: {', '.join(failed)}")
+    click.echo(f"NLTK data installed in {data_dir}")
@@ -0,0 +1,129 @@
+import numpy as np
+
+class CompiledForest:
+    """
+    Random forest flattened into contiguous node arrays. All trees are walked at
+    once with vectorized numpy gathers, reproducing sklearn's predict_proba
+    bit for bit: float32 feature values compared against float64 thresholds,
+    leaf probabilities accumulated tree by tree, then divided by the tree count.
+    """
+
+    def __init__(self, roots, left, right, feature, threshold, value, used_features, max_depth):
+        self.roots = roots
+        self.left = left
+        self.right = right
+        self.feature = feature
+        self.threshold = threshold
+        self.value = value
+        self.used_features = used_features
+        self.max_depth = max_depth
+
+    @classmethod
+    def from_sklearn(cls, forest):
+        """Flatten a fitted single-output RandomForestClassifier"""
+        trees = [estimator.tree_ for estimator in forest.estimators_]
+        n_classes = int(forest.n_classes_)
+
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+        lefts, rights, features, thresholds, values = [], [], [], [], []
+        for offset, tree in zip(offsets, trees):
+            node_ids = np.arange(tree.node_count) + offset
+            is_leaf = tree.children_left == -1
+            # Leaves point at themselves so extra iterations are no-ops
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left + offset))
+            rights.append(np.where(is_leaf, node_ids, tree.children_right + offset))
+            features.append(np.where(is_leaf, -1, tree.feature))
+            thresholds.append(tree.threshold)
+            values.append(tree.value[:, 0, :n_classes])
+
+        feature = np.concatenate(features)
+        used_features = np.unique(feature[feature >= 0])
+        # Leaves read the first compact column; their comparison result is ignored
+        compact_feature = np.where(feature >= 0, np.searchsorted(used_features, feature), 0)
+
+        return cls(
+            roots=offsets[:-1].astype(np.intp),
+            left=np.concatenate(lefts).astype(np.intp),
+            right=np.concatenate(rights).astype(np.intp),
+            feature=compact_feature.astype(np.intp),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            value=np.ascontiguousarray(np.concatenate(values), dtype=np.float64),
+            used_features=used_features.astype(np.intp),
+            max_depth=max(tree.max_depth for tree in trees)
+        )
+
+    def apply(self, X):
+        """Leaf node index reached in every tree for every row of X"""
+        # Trees only read a few hundred columns; densify just those, as float32
+        X_used = X[:, self.used_features]
+        X_used = X_used.toarray() if hasattr(X_used, 'toarray') else np.asarray(X_used)
+        X_used = X_used.astype(np.float32)
+
+        rows = np.arange(X_used.shape[0])[:, None]
+        nodes = np.broadcast_to(self.roots, (X_used.shape[0], len(self.roots))).copy()
+        for _ in range(self.max_depth):
+            go_left = X_used[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def predict_proba(self, X, chunk_size=4096):
+        """Class probabilities, identical to RandomForestClassifier.predict_proba"""
+        n_rows = X.shape[0]
+        proba = np.zeros((n_rows, self.value.shape[1]), dtype=np.float64)
+
+        for start in range(0, n_rows, chunk_size):
+            leaves = self.apply(X[start:start + chunk_size])
+            chunk = proba[start:start + chunk_size]
+            for tree in range(leaves.shape[1]):
+                chunk += self.value[leaves[:, tree]]
+
+        proba /= len(self.roots)
+        return proba
+
+class CompiledLinear:
+    """Binary logistic model (LogisticRegression, log-loss SGDClassifier) as plain arrays"""
+
+    def __init__(self, coef, intercept):
+        self.coef = coef
+        self.intercept = intercept
+
+    @classmethod
+    def from_sklearn(cls, model):
+        return cls(
+            coef=np.ascontiguousarray(model.coef_.T, dtype=np.float64),
+            intercept=np.asarray(model.intercept_, dtype=np.float64)
+        )
+
+    def predict_proba(self, X):
+        """Class probabilities, identical to the binary sklearn predict_proba"""
+        from scipy.special import expit
+
+        scores = X @ self.coef
+        scores = np.asarray(scores.toarray() if hasattr(scores, 'toarray') else scores) + self.intercept
+        prob = expit(scores.reshape(-1))
+        return np.stack([1 - prob, prob], axis=1)
+
+def compile_model(model):
+    """Compiled equivalent of a fitted model, or None if it is not supported"""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression, SGDClassifier
+
+    if isinstance(model, RandomForestClassifier) and model.n_outputs_ == 1:
+        return CompiledForest.from_sklearn(model)
+
+    is_logistic = isinstance(model, LogisticRegression) or (
+        isinstance(model, SGDClassifier) and model.loss == 'log_loss'
+    )
+    if is_logistic and len(model.classes_) == 2:
+        return CompiledLinear.from_sklearn(model)
+
+    return None
+
+def compile_models(models):
+    """Compile every supported model in a name -> model dict"""
+    compiled = {}
+    for name, model in models.items():
+        compiled_model = compile_model(model)
+        if compiled_model is not None:
+            compiled[name] = compiled_model
+    return compiled
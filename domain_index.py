@@ -0,0 +1,33 @@
+def normalize_domain(domain):
+    """Lowercase domain without surrounding dots or a leading '*.' / 'www.'"""
+    domain = (domain or '').strip().lower().strip('.')
+    for prefix in ('*.', 'www.'):
+        if domain.startswith(prefix):
+            domain = domain[len(prefix):]
+    return domain
+
+class DomainIndex:
+    """
+    Domain -> trust score map answering subdomain-aware lookups. A host is
+    resolved by probing its suffixes from the full name down to the top-level
+    label, so `edition.cnn.com` finds an entry for `cnn.com`; the most specific
+    entry wins. Each lookup is one hash probe per label.
+    """
+
+    def __init__(self, scores=None):
+        # Takes ownership of scores; large indexes are not copied
+        self.scores = scores if scores is not None else {}
+
+    def __len__(self):
+        return len(self.scores)
+
+    def lookup(self, host):
+        """Trust score of the most specific listed suffix of host, or None"""
+        host = normalize_domain(host)
+        scores = self.scores
+        while host:
+            score = scores.get(host)
+            if score is not None:
+                return score
+            _, _, host = host.partition('.')
+        return None
@@ -0,0 +1,146 @@
+import logging
+import os
+import threading
+from datetime import datetime
+from sqlalchemy import select, func, delete, insert
+from app import db
+from models import TrustedSource
+from domain_index import DomainIndex, normalize_domain
+
+class DomainReputation:
+    """
+    Domain index loaded from the TrustedSource table on top of built-in
+    defaults. A background thread per process rebuilds the index whenever the
+    table changes and swaps it in with one reference assignment, so lookups
+    never wait for a reload; until the first load finishes they use the
+    defaults.
+    """
+
+    def __init__(self, app, defaults=None, refresh_interval=300, chunk_size=50000):
+        self.app = app
+        self.defaults = {normalize_domain(domain): score for domain, score in (defaults or {}).items()}
+        self.refresh_interval = refresh_interval
+        self.chunk_size = chunk_size
+
+        self.index = DomainIndex(dict(self.defaults))
+        self.loaded_signature = None
+        self.refreshes = 0
+        self._wakeup = threading.Event()
+        self._started_pid = None
+        self._start_lock = threading.Lock()
+
+    def ensure_started(self):
+        """Start the refresh thread once per process (safe after a gunicorn fork)"""
+        if self._started_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._started_pid == os.getpid():
+                return
+            threading.Thread(target=self._refresh_loop, name='domain-reputation', daemon=True).start()
+            self._started_pid = os.getpid()
+
+    def lookup(self, host):
+        """Trust score for host from the current index, or None if it is not listed"""
+        self.ensure_started()
+        return self.index.lookup(host)
+
+    def request_refresh(self):
+        """Ask the refresh thread to check the table now instead of at the next interval"""
+        self._wakeup.set()
+
+    def refresh(self):
+        """Reload the index if TrustedSource changed since the last load; needs an app context"""
+        signature = db.session.execute(
+            select(func.count(), func.max(TrustedSource.id), func.max(TrustedSource.updated_at))
+        ).one()
+        signature = tuple(signature)
+        if signature == self.loaded_signature:
+            return False
+
+        scores = dict(self.defaults)
+        last_id = 0
+        while True:
+            rows = db.session.execute(
+                select(TrustedSource.id, TrustedSource.domain, TrustedSource.trust_score)
+                .where(TrustedSource.id > last_id)
+                .order_by(TrustedSource.id)
+                .limit(self.chunk_size)
+            ).all()
+            if not rows:
+                break
+            for row in rows:
+                scores[normalize_domain(row.domain)] = row.trust_score
+            last_id = rows[-1].id
+
+        self.index = DomainIndex(scores)
+        self.loaded_signature = signature
+        self.refreshes += 1
+        logging.info(f"Loaded {len(scores)} domain reputations")
+        return True
+
+    def _refresh_loop(self):
+        while True:
+            try:
+                with self.app.app_context():
+                    self.refresh()
+            except Exception as e:
+                logging.error(f"Domain reputation refresh error: {str(e)}")
+
+            if self.refresh_interval <= 0 and self.loaded_signature is not None:
+                return
+            self._wakeup.wait(self.refresh_interval if self.refresh_interval > 0 else 60)
+            self._wakeup.clear()
+
+    def stats(self):
+        """Size of the loaded index and how often it was rebuilt"""
+        return {
+            'domains': len(self.index),
+            'refreshes': self.refreshes,
+            'refresh_interval': self.refresh_interval
+        }
+
+def import_trusted_sources(rows, batch_size=10000):
+    """
+    Insert or update (domain, trust_score) pairs in TrustedSource, one
+    multi-row upsert and commit per batch so arbitrarily large lists stream
+    through in bounded memory. Domains are normalized; within a batch the
+    last score for a domain wins.
+    Yields: int - rows written by each committed batch
+    """
+    batch = {}
+    for domain, trust_score in rows:
+        domain = normalize_domain(domain)
+        if domain:
+            batch[domain] = trust_score
+        if len(batch) >= batch_size:
+            yield _upsert_trusted_sources(batch)
+            batch = {}
+    if batch:
+        yield _upsert_trusted_sources(batch)
+
+def _upsert_trusted_sources(batch):
+    """Write one batch of domain -> score and commit"""
+    now = datetime.utcnow()
+    values = [
+        {'domain': domain, 'trust_score': score, 'created_at': now, 'updated_at': now}
+        for domain, score in batch.items()
+    ]
+
+    dialect = db.engine.dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        statement = dialect_insert(TrustedSource)
+        statement = statement.on_conflict_do_update(
+            index_elements=['domain'],
+            set_={'trust_score': statement.excluded.trust_score, 'updated_at': statement.excluded.updated_at}
+        )
+        db.session.execute(statement, values)
+    else:
+        db.session.execute(delete(TrustedSource).where(TrustedSource.domain.in_(list(batch))))
+        db.session.execute(insert(TrustedSource), values)
+
+    db.session.commit()
+    return len(values)
@@ -0,0 +1,211 @@
+import sqlite3
+import threading
+import time
+import logging
+import os
+from collections import namedtuple
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+
+CachedResponse = namedtuple(
+    'CachedResponse',
+    ['url_key', 'body', 'content_type', 'etag', 'last_modified', 'fetched_at', 'is_fresh']
+)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+def normalize_url(url):
+    """Normalize a URL into a cache key (case, default ports, fragments, query order)"""
+    parsed = urlparse(url.strip())
+    scheme = parsed.scheme.lower()
+    host = (parsed.hostname or '').lower()
+
+    netloc = host
+    if parsed.port and parsed.port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{host}:{parsed.port}"
+
+    query = urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)))
+    return urlunparse((scheme, netloc, parsed.path or '/', parsed.params, query, ''))
+
+class HTTPCache:
+    """
+    Persistent, size-bounded LRU cache of HTTP responses backed by SQLite.
+    Triggers keep the total body size in a one-row table, so eviction checks
+    do not scan the cache, and hits refresh an entry's access time at most
+    once per touch_interval seconds, so most hits are read-only.
+    """
+
+    def __init__(self, path, max_bytes=256 * 1024 * 1024, ttl=3600, touch_interval=60):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.touch_interval = touch_interval
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'stale': 0, 'revalidated': 0, 'stores': 0, 'evictions': 0}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._connection()
+        conn.executescript("""
+            BEGIN IMMEDIATE;
+            CREATE TABLE IF NOT EXISTS responses (
+                url_key TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                content_type TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS ix_responses_accessed_at ON responses (accessed_at);
+
+            CREATE TABLE IF NOT EXISTS cache_size (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                total INTEGER NOT NULL
+            );
+            -- Caches created before the triggers existed start from their current size
+            INSERT OR IGNORE INTO cache_size (id, total) SELECT 1, COALESCE(SUM(size), 0) FROM responses;
+            CREATE TRIGGER IF NOT EXISTS responses_size_insert AFTER INSERT ON responses
+                BEGIN UPDATE cache_size SET total = total + NEW.size WHERE id = 1; END;
+            CREATE TRIGGER IF NOT EXISTS responses_size_update AFTER UPDATE OF size ON responses
+                BEGIN UPDATE cache_size SET total = total - OLD.size + NEW.size WHERE id = 1; END;
+            CREATE TRIGGER IF NOT EXISTS responses_size_delete AFTER DELETE ON responses
+                BEGIN UPDATE cache_size SET total = total - OLD.size WHERE id = 1; END;
+            COMMIT;
+        """)
+
+    def _connection(self):
+        """One SQLite connection per thread; WAL lets worker processes share the file"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, name, amount=1):
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    def get(self, url):
+        """
+        Look up a cached response and mark it as recently used if its access
+        time is older than touch_interval
+        Returns: CachedResponse or None
+        """
+        key = normalize_url(url)
+        try:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT body, content_type, etag, last_modified, fetched_at, accessed_at "
+                "FROM responses WHERE url_key = ?",
+                (key,)
+            ).fetchone()
+
+            if row is None:
+                self._count('misses')
+                return None
+
+            now = time.time()
+            if now - row[5] >= self.touch_interval:
+                conn.execute("UPDATE responses SET accessed_at = ? WHERE url_key = ?", (now, key))
+                conn.commit()
+
+            is_fresh = now - row[4] < self.ttl
+            self._count('hits' if is_fresh else 'stale')
+            return CachedResponse(key, row[0], row[1], row[2], row[3], row[4], is_fresh)
+
+        except sqlite3.Error as e:
+            logging.warning(f"HTTP cache read error for {url}: {str(e)}")
+            self._count('misses')
+            return None
+
+    def put(self, url, body, content_type='', etag=None, last_modified=None):
+        """Store a response body and its validators, evicting old entries if over budget"""
+        if len(body) > self.max_bytes:
+            return
+
+        key = normalize_url(url)
+        now = time.time()
+        try:
+            conn = self._connection()
+            # An upsert rather than INSERT OR REPLACE: REPLACE deletes the old row
+            # without firing the delete trigger, which would inflate the total
+            conn.execute(
+                "INSERT INTO responses "
+                "(url_key, body, content_type, etag, last_modified, size, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (url_key) DO UPDATE SET body = excluded.body, content_type = excluded.content_type, "
+                "etag = excluded.etag, last_modified = excluded.last_modified, size = excluded.size, "
+                "fetched_at = excluded.fetched_at, accessed_at = excluded.accessed_at",
+                (key, sqlite3.Binary(body), content_type, etag, last_modified, len(body), now, now)
+            )
+            conn.commit()
+            self._count('stores')
+            self._evict(conn)
+        except sqlite3.Error as e:
+            logging.warning(f"HTTP cache write error for {url}: {str(e)}")
+
+    def refresh(self, url):
+        """Mark a cached entry as fresh after a 304 Not Modified revalidation"""
+        key = normalize_url(url)
+        now = time.time()
+        try:
+            conn = self._connection()
+            conn.execute(
+                "UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE url_key = ?",
+                (now, now, key)
+            )
+            conn.commit()
+            self._count('revalidated')
+        except sqlite3.Error as e:
+            logging.warning(f"HTTP cache refresh error for {url}: {str(e)}")
+
+    def _evict(self, conn):
+        """Delete least recently used entries until the cache fits in max_bytes"""
+        total = self._total_size(conn)
+        if total <= self.max_bytes:
+            return
+
+        evicted = 0
+        while total > self.max_bytes:
+            rows = conn.execute("SELECT url_key, size FROM responses ORDER BY accessed_at LIMIT 64").fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                conn.execute("DELETE FROM responses WHERE url_key = ?", (key,))
+                total -= size
+                evicted += 1
+
+        conn.commit()
+        self._count('evictions', evicted)
+
+    def _total_size(self, conn):
+        return conn.execute("SELECT total FROM cache_size WHERE id = 1").fetchone()[0]
+
+    def counters(self):
+        """Hit/miss counters for this process, without touching the cache database"""
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def stats(self):
+        """Hit/miss counters for this process plus the current cache size"""
+        stats = self.counters()
+
+        lookups = stats['hits'] + stats['stale'] + stats['misses']
+        stats['hit_rate'] = (stats['hits'] + stats['revalidated']) / lookups if lookups else 0.0
+
+        try:
+            conn = self._connection()
+            stats['entries'] = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            stats['size_bytes'] = self._total_size(conn)
+        except sqlite3.Error as e:
+            logging.warning(f"HTTP cache stats error: {str(e)}")
+
+        return stats
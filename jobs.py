@@ -0,0 +1,287 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import select, update, delete, func
+from app import db
+from models import AnalysisJob
+
+class QueueFullError(Exception):
+    """Raised when too many jobs are already waiting"""
+
+class JobQueue:
+    """
+    Analysis job queue stored in the application database, so any app process
+    can accept a job or report its status without an external broker. Each
+    process runs a bounded pool of worker threads that claim queued jobs.
+    A claim is owned through a unique token and kept alive by a heartbeat
+    thread; a running job is only reclaimed once its heartbeat is older than
+    stale_after seconds, i.e. its worker has died. The same thread deletes
+    finished jobs older than retention at most every purge_interval seconds.
+    """
+
+    def __init__(self, app, handler, workers=4, max_queued=1000, poll_interval=1.0,
+                 stale_after=120, heartbeat_interval=30, retention=86400, purge_interval=300):
+        self.app = app
+        self.handler = handler
+        self.workers = workers
+        self.max_queued = max_queued
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.heartbeat_interval = heartbeat_interval
+        self.retention = retention
+        self.purge_interval = purge_interval
+        self._next_purge = 0.0
+
+        # job id -> claim token of jobs running in this process
+        self._active = {}
+        self._active_lock = threading.Lock()
+
+        self._wakeup = threading.Event()
+        self._threads = []
+        self._started_pid = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.completed = 0
+        self.failed = 0
+
+    def ensure_started(self):
+        """Start worker threads once per process (safe after a gunicorn fork)"""
+        if self._started_pid == os.getpid() or self.workers <= 0:
+            return
+        with self._start_lock:
+            if self._started_pid == os.getpid():
+                return
+            self._threads = [
+                threading.Thread(target=self._worker_loop, name=f'analysis-job-{i}', daemon=True)
+                for i in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+            threading.Thread(target=self._maintenance_loop, name='analysis-job-maintenance', daemon=True).start()
+            self._started_pid = os.getpid()
+            logging.info(f"Started {self.workers} analysis job workers in process {os.getpid()}")
+
+    def submit(self, content, url=None, force=False):
+        """
+        Queue an analysis and return immediately
+        Returns: AnalysisJob
+        """
+        if self.queue_depth() >= self.max_queued:
+            raise QueueFullError(f"More than {self.max_queued} jobs are waiting")
+
+        job = AnalysisJob(
+            id=uuid.uuid4().hex,
+            status='queued',
+            content=content,
+            url=url or None,
+            force=force
+        )
+        db.session.add(job)
+        db.session.commit()
+
+        self.ensure_started()
+        self._wakeup.set()
+        return job
+
+    def get(self, job_id):
+        """Look up a job by id"""
+        return db.session.get(AnalysisJob, job_id)
+
+    def queue_depth(self):
+        """Number of jobs waiting for a worker"""
+        return db.session.scalar(
+            select(func.count()).select_from(AnalysisJob).where(AnalysisJob.status == 'queued')
+        )
+
+    def _worker_loop(self):
+        while True:
+            try:
+                with self.app.app_context():
+                    claim = self._claim_next()
+                    if claim is not None:
+                        self._run(*claim)
+            except Exception as e:
+                logging.error(f"Job worker error: {str(e)}")
+                claim = None
+
+            if claim is None:
+                # Idle: wait for a local submit, or poll for jobs queued by other processes
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def _claim_next(self):
+        """
+        Atomically move the oldest queued job, or a running job whose worker
+        stopped sending heartbeats, to running under a new claim token
+        Returns: tuple (job id, token) or None
+        """
+        stale_before = datetime.utcnow() - timedelta(seconds=self.stale_after)
+        # Jobs claimed before heartbeats existed only have started_at
+        abandoned = (
+            (AnalysisJob.status == 'running') &
+            (func.coalesce(AnalysisJob.heartbeat_at, AnalysisJob.started_at) < stale_before)
+        )
+        candidates = db.session.scalars(
+            select(AnalysisJob.id)
+            .where((AnalysisJob.status == 'queued') | abandoned)
+            .order_by(AnalysisJob.created_at)
+            .limit(self.workers)
+        ).all()
+
+        for job_id in candidates:
+            token = uuid.uuid4().hex
+            now = datetime.utcnow()
+            claimed = db.session.execute(
+                update(AnalysisJob)
+                .where(AnalysisJob.id == job_id)
+                .where((AnalysisJob.status == 'queued') | abandoned)
+                .values(status='running', started_at=now, heartbeat_at=now, claimed_by=token)
+            )
+            db.session.commit()
+            if claimed.rowcount == 1:
+                with self._active_lock:
+                    self._active[job_id] = token
+                return job_id, token
+        return None
+
+    def _run(self, job_id, token):
+        """
+        Run the analysis handler for a claimed job and record the outcome,
+        unless the claim was lost to another worker in the meantime
+        """
+        try:
+            job = db.session.get(AnalysisJob, job_id)
+            try:
+                analysis, _ = self.handler(job.content, url=job.url, force=job.force)
+                outcome = {'status': 'done', 'analysis_id': analysis.id}
+            except Exception as e:
+                db.session.rollback()
+                logging.error(f"Analysis job {job_id} failed: {str(e)}")
+                outcome = {'status': 'failed', 'error': str(e) if isinstance(e, ValueError) else 'Analysis failed'}
+
+            # The submission is no longer needed once the result is stored
+            finished = db.session.execute(
+                update(AnalysisJob)
+                .where(AnalysisJob.id == job_id)
+                .where(AnalysisJob.claimed_by == token)
+                .where(AnalysisJob.status == 'running')
+                .values(content=None, finished_at=datetime.utcnow(), **outcome)
+            )
+            db.session.commit()
+        finally:
+            with self._active_lock:
+                self._active.pop(job_id, None)
+
+        if finished.rowcount != 1:
+            logging.warning(f"Analysis job {job_id} was reclaimed by another worker; discarding this result")
+            return
+        with self._stats_lock:
+            if outcome['status'] == 'done':
+                self.completed += 1
+            else:
+                self.failed += 1
+
+    def _maintenance_loop(self):
+        """Send heartbeats for running jobs and purge expired ones, from one thread per process"""
+        while True:
+            time.sleep(self.heartbeat_interval)
+            try:
+                with self.app.app_context():
+                    self._send_heartbeats()
+            except Exception as e:
+                logging.error(f"Job heartbeat error: {str(e)}")
+
+            if time.monotonic() < self._next_purge:
+                continue
+            self._next_purge = time.monotonic() + self.purge_interval
+            try:
+                with self.app.app_context():
+                    self._purge_expired()
+            except Exception as e:
+                logging.error(f"Job purge error: {str(e)}")
+
+    def _send_heartbeats(self):
+        """Refresh heartbeat_at of the jobs this process is running"""
+        with self._active_lock:
+            tokens = list(self._active.values())
+        if not tokens:
+            return
+        db.session.execute(
+            update(AnalysisJob)
+            .where(AnalysisJob.claimed_by.in_(tokens))
+            .where(AnalysisJob.status == 'running')
+            .values(heartbeat_at=datetime.utcnow())
+        )
+        db.session.commit()
+
+    def _purge_expired(self):
+        """Delete finished jobs older than the retention period"""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.retention)
+        db.session.execute(
+            delete(AnalysisJob)
+            .where(AnalysisJob.status.in_(['done', 'failed']))
+            .where(AnalysisJob.finished_at < cutoff)
+        )
+        db.session.commit()
+
+    def gauges(self):
+        """
+        Job counts by status and the age of the oldest queued job, from two
+        aggregate queries (cheap enough for every metrics scrape)
+        Returns: dict
+        """
+        counts = dict(db.session.execute(
+            select(AnalysisJob.status, func.count()).group_by(AnalysisJob.status)
+        ).all())
+        oldest_queued = db.session.scalar(
+            select(func.min(AnalysisJob.created_at)).where(AnalysisJob.status == 'queued')
+        )
+        return {
+            'queue_depth': counts.get('queued', 0),
+            'running': counts.get('running', 0),
+            'done': counts.get('done', 0),
+            'failed': counts.get('failed', 0),
+            'oldest_queued_age_seconds': (
+                (datetime.utcnow() - oldest_queued).total_seconds() if oldest_queued else 0.0
+            )
+        }
+
+    def metrics(self, window=3600):
+        """Queue depth, running jobs and wait times of jobs started within window seconds"""
+        gauges = self.gauges()
+
+        since = datetime.utcnow() - timedelta(seconds=window)
+        started = db.session.execute(
+            select(AnalysisJob.created_at, AnalysisJob.started_at)
+            .where(AnalysisJob.started_at >= since)
+            .order_by(AnalysisJob.started_at.desc())
+            .limit(10000)
+        ).all()
+        waits = sorted((started_at - created_at).total_seconds() for created_at, started_at in started)
+
+        with self._stats_lock:
+            completed, failed = self.completed, self.failed
+
+        return {
+            **gauges,
+            'wait_seconds': {
+                'count': len(waits),
+                'mean': sum(waits) / len(waits) if waits else 0.0,
+                'p50': _percentile(waits, 0.5),
+                'p95': _percentile(waits, 0.95),
+                'max': waits[-1] if waits else 0.0
+            },
+            'workers': self.workers,
+            'worker_completed': completed,
+            'worker_failed': failed
+        }
+
+def _percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
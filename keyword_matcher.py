@@ -0,0 +1,115 @@
+import re
+import threading
+
+# Indicator sets matched against lowercased article text
+INDICATOR_SETS = {
+    # TextAnalyzer: common fake news keywords and patterns
+    'fake_keywords': [
+        'breaking', 'urgent', 'shocking', 'bombshell', 'exposed', 'leaked',
+        'secret', 'hidden', 'conspiracy', 'cover-up', 'mainstream media',
+        'deep state', 'fake news', 'hoax', 'scam', 'lies', 'deception',
+        'you won\'t believe', 'doctors hate', 'one simple trick',
+        'this will blow your mind', 'they don\'t want you to know'
+    ],
+    # TextAnalyzer: credible source indicators
+    'credible_keywords': [
+        'study', 'research', 'according to', 'data shows', 'evidence',
+        'peer-reviewed', 'university', 'institution', 'official',
+        'government', 'reuters', 'associated press', 'published',
+        'journal', 'investigation', 'verified', 'confirmed'
+    ],
+    # FakeNewsDetector rules: fake news indicators (decrease score)
+    'fake_indicators': [
+        'breaking:', 'urgent:', 'shocking', 'bombshell', 'exposed', 'leaked',
+        'secret', 'hidden truth', 'they don\'t want you to know', 'mainstream media',
+        'wake up', 'sheeple', 'conspiracy', 'cover-up', 'you won\'t believe',
+        'doctors hate', 'one simple trick', 'this will blow your mind'
+    ],
+    # FakeNewsDetector rules: real news indicators (increase score)
+    'real_indicators': [
+        'according to', 'study shows', 'research indicates', 'data suggests',
+        'reuters', 'associated press', 'government officials', 'peer-reviewed',
+        'university', 'published in', 'sources confirm', 'investigation'
+    ],
+}
+
+class KeywordMatcher:
+    """
+    Match many named keyword sets against text in a single regex pass.
+    Terms are compiled into one trie-shaped pattern inside a lookahead, so every
+    start position reports its longest term; shorter terms sharing that start are
+    recovered from a precomputed prefix table. This matches the substring
+    semantics of `term in text` for every term without rescanning per term.
+    """
+
+    def __init__(self, keyword_sets):
+        self.keyword_sets = {name: [term.lower() for term in terms] for name, terms in keyword_sets.items()}
+
+        terms = sorted({term for terms in self.keyword_sets.values() for term in terms if term})
+        trie = {}
+        for term in terms:
+            node = trie
+            for char in term:
+                node = node.setdefault(char, {})
+            node[''] = term
+
+        self._prefixes = {}
+        self._collect_prefixes(trie, [])
+        self._pattern = re.compile('(?=(' + self._trie_pattern(trie) + '))') if terms else None
+
+    def _collect_prefixes(self, node, path_terms):
+        """Map every term to the shorter terms that are its prefixes"""
+        if '' in node:
+            self._prefixes[node['']] = list(path_terms)
+            path_terms = path_terms + [node['']]
+        for char, child in node.items():
+            if char:
+                self._collect_prefixes(child, path_terms)
+
+    def _trie_pattern(self, node):
+        """Regex for a trie node, preferring the longest continuation"""
+        branches = [re.escape(char) + self._trie_pattern(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+
+        pattern = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            # A term ends here; the continuation is optional
+            pattern = '(?:' + pattern + ')?'
+        return pattern
+
+    def find_terms(self, text_lower):
+        """Return the set of all terms occurring anywhere in lowercased text"""
+        found = set()
+        if self._pattern is None:
+            return found
+
+        for match in self._pattern.finditer(text_lower):
+            term = match.group(1)
+            if term and term not in found:
+                found.add(term)
+                found.update(self._prefixes[term])
+        return found
+
+    def match(self, text_lower):
+        """
+        Match all keyword sets against lowercased text in one pass
+        Returns: dict - set name -> matched terms, in the set's original order
+        """
+        found = self.find_terms(text_lower)
+        return {
+            name: [term for term in terms if term in found]
+            for name, terms in self.keyword_sets.items()
+        }
+
+_matcher = None
+_matcher_lock = threading.Lock()
+
+def get_matcher():
+    """Shared matcher built once from INDICATOR_SETS"""
+    global _matcher
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                _matcher = KeywordMatcher(INDICATOR_SETS)
+    return _matcher
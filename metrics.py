@@ -0,0 +1,353 @@
+import atexit
+import bisect
+import fcntl
+import glob
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+
+# Metric names
+STAGE_SECONDS = 'fakenews_stage_seconds'
+MODEL_SECONDS = 'fakenews_model_seconds'
+REQUEST_SECONDS = 'fakenews_http_request_seconds'
+ERRORS = 'fakenews_errors_total'
+SCORED = 'fakenews_scored_total'
+CACHE_LOOKUPS = 'fakenews_cache_lookups_total'
+
+HELP = {
+    STAGE_SECONDS: 'Latency of analysis pipeline stages',
+    MODEL_SECONDS: 'Latency of individual model predictions',
+    REQUEST_SECONDS: 'HTTP request latency until the response is returned',
+    ERRORS: 'Errors raised or handled, by pipeline stage',
+    SCORED: 'Texts scored, by the stage that decided the score',
+    CACHE_LOOKUPS: 'Cache lookups by cache and result',
+}
+
+# Latency histogram bucket upper bounds, in seconds
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Per-process files are <pid>-<start nonce>.json; exited processes' totals are
+# folded into the aggregate file so the directory does not grow with restarts
+PROCESS_FILE = re.compile(r'^(\d+)(?:-[0-9a-f]+)?\.json$')
+AGGREGATE_FILE = 'exited.json'
+LOCK_FILE = '.lock'
+
+class MetricsRegistry:
+    """
+    Counters and latency histograms for one process. With a directory
+    configured, each process periodically writes its values to
+    <pid>-<nonce>.json there, and collect() merges the files of every process
+    (e.g. all gunicorn workers and scoring pool processes) without any
+    external service. The nonce keeps a reused pid from overwriting the file
+    of the exited process that had it before.
+    """
+
+    def __init__(self):
+        self.directory = None
+        self.flush_interval = 5.0
+        self._counters = {}
+        self._histograms = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+        self._flusher_pid = None
+        self._file_pid = None
+        self._filename = None
+
+    def configure(self, directory, flush_interval=5.0):
+        """Share metrics through files in directory (None keeps them in-process only)"""
+        self.directory = directory or None
+        self.flush_interval = flush_interval
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+        self._ensure_flusher()
+
+    def observe(self, name, seconds, **labels):
+        self.observe_key((name, tuple(sorted(labels.items()))), seconds)
+
+    def observe_key(self, key, seconds):
+        """observe() for a precomputed (name, sorted label pairs) key"""
+        index = bisect.bisect_left(BUCKETS, seconds)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                # Per-bucket (non-cumulative) counts, +Inf last, then sum
+                histogram = self._histograms[key] = [0] * (len(BUCKETS) + 1) + [0.0]
+            histogram[index] += 1
+            histogram[-1] += seconds
+        self._ensure_flusher()
+
+    def add_collector(self, collector):
+        """Register a callable returning (counter name, labels dict, value) tuples, read at snapshot time"""
+        self._collectors.append(collector)
+
+    def snapshot(self):
+        """This process's current values as a JSON-serializable dict"""
+        with self._lock:
+            counters = [[name, list(labels), value] for (name, labels), value in self._counters.items()]
+            histograms = [[name, list(labels), list(values)] for (name, labels), values in self._histograms.items()]
+
+        for collector in self._collectors:
+            try:
+                for name, labels, value in collector():
+                    counters.append([name, sorted(labels.items()), value])
+            except Exception as e:
+                logging.error(f"Metrics collector error: {str(e)}")
+
+        return {'counters': counters, 'histograms': histograms}
+
+    def flush(self):
+        """Write this process's snapshot to the shared directory"""
+        if not self.directory:
+            return
+        if self._file_pid != os.getpid():
+            self._file_pid = os.getpid()
+            self._filename = f'{self._file_pid}-{uuid.uuid4().hex[:12]}.json'
+        path = os.path.join(self.directory, self._filename)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp_path, path)
+
+    def collect(self):
+        """Snapshots of every process, with this process's values up to date"""
+        if not self.directory:
+            return [self.snapshot()]
+
+        self.flush()
+        try:
+            self._fold_exited()
+        except Exception as e:
+            logging.error(f"Metrics fold error: {str(e)}")
+
+        snapshots = []
+        for path in glob.glob(os.path.join(self.directory, '*.json')):
+            try:
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                # Being replaced by its process right now; picked up on the next scrape
+                continue
+        return snapshots
+
+    def _fold_exited(self):
+        """
+        Merge the files of processes that are no longer running into the
+        aggregate file and delete them. The aggregate lists the files it has
+        absorbed, so a crash between writing it and deleting them cannot count
+        them twice.
+        """
+        exited = []
+        for name in os.listdir(self.directory):
+            match = PROCESS_FILE.match(name)
+            if match and not _pid_running(int(match.group(1))):
+                exited.append(name)
+        if not exited:
+            return
+
+        with open(os.path.join(self.directory, LOCK_FILE), 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            aggregate_path = os.path.join(self.directory, AGGREGATE_FILE)
+            try:
+                with open(aggregate_path) as f:
+                    aggregate = json.load(f)
+            except FileNotFoundError:
+                aggregate = {'counters': [], 'histograms': [], 'folded': []}
+
+            folded = set(aggregate.get('folded', []))
+            snapshots = [aggregate]
+            for name in exited:
+                if name in folded:
+                    continue
+                try:
+                    with open(os.path.join(self.directory, name)) as f:
+                        snapshots.append(json.load(f))
+                except FileNotFoundError:
+                    # Folded by another process since the listing
+                    continue
+                folded.add(name)
+
+            if len(snapshots) > 1:
+                aggregate = _merged_snapshot(snapshots)
+                # Names already deleted can no longer be read twice
+                aggregate['folded'] = sorted(name for name in folded
+                                             if os.path.exists(os.path.join(self.directory, name)))
+                tmp_path = f'{aggregate_path}.tmp'
+                with open(tmp_path, 'w') as f:
+                    json.dump(aggregate, f)
+                os.replace(tmp_path, aggregate_path)
+
+            for name in exited:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    pass
+
+    def _ensure_flusher(self):
+        """Start the periodic flush thread once per process (after any fork)"""
+        if self._flusher_pid == os.getpid() or not self.directory:
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        threading.Thread(target=self._flush_loop, name='metrics-flush', daemon=True).start()
+        atexit.register(self._safe_flush)
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self._safe_flush()
+
+    def _safe_flush(self):
+        try:
+            self.flush()
+        except Exception as e:
+            logging.error(f"Metrics flush error: {str(e)}")
+
+registry = MetricsRegistry()
+
+# Per-request list of (key, seconds) that timed blocks append to, created only
+# when profiling is enabled so unprofiled processes skip even the lookup
+request_stages = None
+
+def enable_stage_recording():
+    """
+    Create the request_stages context variable; set it to a list to collect the
+    timed blocks of the current request
+    Returns: ContextVar
+    """
+    global request_stages
+    if request_stages is None:
+        request_stages = ContextVar('request_stages', default=None)
+    return request_stages
+
+def configure(directory, flush_interval=5.0):
+    registry.configure(directory, flush_interval)
+
+def inc(name, amount=1, **labels):
+    """Add to a counter"""
+    registry.inc(name, amount, **labels)
+
+def observe(name, seconds, **labels):
+    """Record one latency observation in a histogram"""
+    registry.observe(name, seconds, **labels)
+
+class timed:
+    """Time the block into histogram name, counting an error for error_stage if it raises"""
+
+    __slots__ = ('key', 'error_stage', 'start')
+
+    def __init__(self, name, error_stage=None, **labels):
+        self.key = (name, tuple(sorted(labels.items())))
+        self.error_stage = error_stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        registry.observe_key(self.key, elapsed)
+        if request_stages is not None:
+            stages = request_stages.get()
+            if stages is not None:
+                stages.append((self.key, elapsed))
+        if exc_type is not None and self.error_stage and issubclass(exc_type, Exception):
+            registry.inc(ERRORS, stage=self.error_stage)
+        return False
+
+def stage(name):
+    """Time one pipeline stage (fetch, extract, vectorize, sentiment, db_commit, ...)"""
+    return timed(STAGE_SECONDS, error_stage=name, stage=name)
+
+def _merge(snapshots):
+    """
+    Sum counters and histogram buckets of several snapshots
+    Returns: tuple - (counters dict, histograms dict) keyed by (name, label pairs)
+    """
+    counters = {}
+    histograms = {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot.get('counters', []):
+            key = (name, tuple(tuple(pair) for pair in labels))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, values in snapshot.get('histograms', []):
+            key = (name, tuple(tuple(pair) for pair in labels))
+            merged = histograms.get(key)
+            if merged is None:
+                histograms[key] = list(values)
+            else:
+                histograms[key] = [a + b for a, b in zip(merged, values)]
+    return counters, histograms
+
+def _merged_snapshot(snapshots):
+    counters, histograms = _merge(snapshots)
+    return {
+        'counters': [[name, [list(pair) for pair in labels], value] for (name, labels), value in counters.items()],
+        'histograms': [[name, [list(pair) for pair in labels], values] for (name, labels), values in histograms.items()],
+    }
+
+def _pid_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Exists, owned by another user
+        return True
+    return True
+
+def render_prometheus(snapshots, extra_gauges=()):
+    """
+    Merge per-process snapshots (summing counters and histogram buckets) and
+    render them in the Prometheus text exposition format
+    Returns: str
+    """
+    counters, histograms = _merge(snapshots)
+
+    lines = []
+    for name in sorted({name for name, _ in histograms}):
+        lines.append(f'# HELP {name} {HELP.get(name, name)}')
+        lines.append(f'# TYPE {name} histogram')
+        for (metric, labels), values in sorted(histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(BUCKETS + (float('inf'),), values[:-1]):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{name}_bucket{_labels(labels + (("le", le),))} {cumulative}')
+            lines.append(f'{name}_sum{_labels(labels)} {values[-1]!r}')
+            lines.append(f'{name}_count{_labels(labels)} {cumulative}')
+
+    for name in sorted({name for name, _ in counters}):
+        lines.append(f'# HELP {name} {HELP.get(name, name)}')
+        lines.append(f'# TYPE {name} counter')
+        for (metric, labels), value in sorted(counters.items()):
+            if metric == name:
+                lines.append(f'{name}{_labels(labels)} {value}')
+
+    for name, help_text, labels, value in extra_gauges:
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} gauge')
+        lines.append(f'{name}{_labels(tuple(sorted(labels.items())))} {value}')
+
+    return '\n'.join(lines) + '\n'
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,99 @@
+from sqlalchemy import inspect, text, update, JSON
+from app import db
+import logging
+
+def upgrade_schema():
+    """
+    Bring existing tables up to date with the models. db.create_all() only
+    creates missing tables, so columns and indexes added to a model later are
+    created here, followed by any data backfills they need.
+    """
+    inspector = inspect(db.engine)
+    
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            
+            existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing_columns:
+                    logging.info(f"Adding column {table.name}.{column.name}")
+                    conn.execute(text(_add_column_ddl(conn.dialect, table, column)))
+            
+            existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    logging.info(f"Creating index {index.name}")
+                    index.create(conn)
+    
+    _move_content_to_articles()
+    _convert_details_to_json()
+
+def _add_column_ddl(dialect, table, column):
+    """ALTER TABLE statement adding a nullable column"""
+    preparer = dialect.identifier_preparer
+    column_type = column.type.compile(dialect=dialect)
+    return (
+        f"ALTER TABLE {preparer.format_table(table)} "
+        f"ADD COLUMN {preparer.format_column(column)} {column_type}"
+    )
+
+def _move_content_to_articles(chunk_size=500):
+    """
+    Move the legacy analysis.content column into compressed, deduplicated
+    article rows, then drop it. Rows are processed in id order and each chunk
+    commits on its own, so an interrupted upgrade continues on the next start.
+    """
+    from models import Analysis
+    from article_store import store_articles
+    
+    if not _has_column('analysis', 'content'):
+        return
+    
+    legacy_rows = text("SELECT id, content FROM analysis WHERE id > :last_id ORDER BY id LIMIT :limit")
+    
+    last_id = 0
+    moved = 0
+    while True:
+        rows = db.session.execute(legacy_rows, {'last_id': last_id, 'limit': chunk_size}).all()
+        if not rows:
+            break
+        
+        hashes = [Analysis.hash_content(row.content or '') for row in rows]
+        store_articles(dict(zip(hashes, (row.content or '' for row in rows))))
+        db.session.execute(update(Analysis), [
+            {'id': row.id, 'content_hash': content_hash} for row, content_hash in zip(rows, hashes)
+        ])
+        db.session.commit()
+        
+        last_id = rows[-1].id
+        moved += len(rows)
+    
+    try:
+        with db.engine.begin() as conn:
+            conn.execute(text("ALTER TABLE analysis DROP COLUMN content"))
+    except Exception:
+        # Another process starting up at the same time may have dropped it first
+        if _has_column('analysis', 'content'):
+            raise
+    logging.info(f"Moved content of {moved} analyses into the article table")
+
+def _convert_details_to_json():
+    """Change analysis_details from TEXT to the native JSON type where the database has one"""
+    if db.engine.dialect.name != 'postgresql':
+        # SQLite stores JSON as text; existing values are already JSON documents
+        return
+    
+    columns = {column['name']: column['type'] for column in inspect(db.engine).get_columns('analysis')}
+    if isinstance(columns.get('analysis_details'), JSON):
+        return
+    
+    with db.engine.begin() as conn:
+        conn.execute(text(
+            "ALTER TABLE analysis ALTER COLUMN analysis_details TYPE JSON USING analysis_details::json"
+        ))
+    logging.info("Converted analysis.analysis_details to JSON")
+
+def _has_column(table_name, column_name):
+    return column_name in {column['name'] for column in inspect(db.engine).get_columns(table_name)}
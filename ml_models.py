@@ -1,30 +1,417 @@
 import numpy as np
-import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.pipeline import Pipeline
-from sklearn.model_selection import train_test_split
-import joblib
+import json
 import logging
 import os
 import re
+import threading
+import time
+import uuid
+import metrics
 from collections import Counter
+from analysis_document import AnalysisDocument
+from compiled_models import compile_models
+from datetime import datetime
+
+# Artifact bundle layout: <artifact_dir>/<version>/detector.joblib plus a
+# manifest.json, with <artifact_dir>/LATEST naming the version to serve
+ARTIFACT_FORMAT = 1
+BUNDLE_FILENAME = 'detector.joblib'
+MANIFEST_FILENAME = 'manifest.json'
+LATEST_FILENAME = 'LATEST'
+
+# Width of the stateless hashing feature space used by incremental training
+HASHING_FEATURES = 2 ** 18
+
+
+def new_model_version():
+    """Generate a sortable, unique model version string"""
+    return f"{datetime.utcnow().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def read_latest_version(artifact_dir):
+    """Return the version named by the LATEST pointer, or None"""
+    try:
+        with open(os.path.join(artifact_dir, LATEST_FILENAME)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def publish_bundle(artifact_dir, bundle):
+    """
+    Write an artifact bundle under a new version directory and point LATEST at it.
+    The bundle is stored uncompressed so numpy arrays can be memory-mapped on load.
+    Returns: str - the published version
+    """
+    import joblib
+    
+    version = bundle['version']
+    version_dir = os.path.join(artifact_dir, version)
+    os.makedirs(version_dir, exist_ok=True)
+
+    joblib.dump(bundle, os.path.join(version_dir, BUNDLE_FILENAME))
+
+    manifest = {
+        'format': ARTIFACT_FORMAT,
+        'version': version,
+        'created_at': datetime.utcnow().isoformat(),
+        'models': sorted(bundle['models'].keys()),
+        'kind': bundle.get('kind', 'batch'),
+        'training_state': bundle.get('training_state'),
+    }
+    with open(os.path.join(version_dir, MANIFEST_FILENAME), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    # Swap the pointer atomically so running workers never see a partial write
+    tmp_path = os.path.join(artifact_dir, f'.{LATEST_FILENAME}.{os.getpid()}')
+    with open(tmp_path, 'w') as f:
+        f.write(version)
+    os.replace(tmp_path, os.path.join(artifact_dir, LATEST_FILENAME))
+
+    logging.info(f"Published model version {version} to {artifact_dir}")
+    return version
+
+
+def load_bundle(artifact_dir, version=None, mmap_mode='r'):
+    """
+    Load an artifact bundle read-only with memory-mapped numpy arrays, so the
+    model pages are shared between worker processes through the page cache.
+    Pass mmap_mode=None for a private, writable copy (e.g. to keep training it).
+    Returns: dict or None if no bundle has been published
+    """
+    import joblib
+    
+    version = version or read_latest_version(artifact_dir)
+    if not version:
+        return None
+
+    bundle = joblib.load(os.path.join(artifact_dir, version, BUNDLE_FILENAME), mmap_mode=mmap_mode)
+    if bundle.get('format') != ARTIFACT_FORMAT:
+        raise ValueError(f"Unsupported artifact format {bundle.get('format')} in version {version}")
+    return bundle
+
+
+def train_and_export(artifact_dir):
+    """Train the detector from scratch and publish it as a new version"""
+    detector = FakeNewsDetector()
+    detector.train()
+    return detector.export(artifact_dir)
+
+
+def synthetic_training_data():
+    """
+    Built-in corpus generated from common fake and real news phrasings
+    Returns: tuple (texts, labels) with labels 0 = fake, 1 = real
+    """
+    # Fake news indicators
+    fake_patterns = [
+        "BREAKING: Shocking truth revealed",
+        "Doctors hate this one simple trick",
+        "You won't believe what happened next",
+        "This will blow your mind",
+        "URGENT: Share before it's deleted",
+        "Secret information they don't want you to know",
+        "Mainstream media won't tell you this",
+        "LEAKED: Confidential documents expose",
+        "EXPOSED: The hidden agenda behind",
+        "BOMBSHELL: Investigation reveals shocking",
+    ]
+    
+    # Real news patterns
+    real_patterns = [
+        "According to a study published in",
+        "Reuters reports that officials confirmed",
+        "The Associated Press has learned that",
+        "Government data shows a trend of",
+        "Research conducted by university scientists",
+        "Official statements from the department",
+        "Investigation by journalists revealed",
+        "Data from the national statistics office",
+        "Peer-reviewed research indicates that",
+        "Official government press release states",
+    ]
+    
+    # Generate training samples
+    fake_samples = []
+    real_samples = []
+    
+    for pattern in fake_patterns:
+        for i in range(20):
+            fake_samples.append(f"{pattern} and many people are concerned about the implications of these findings for the future.")
+    
+    for pattern in real_patterns:
+        for i in range(20):
+            real_samples.append(f"{pattern} and the findings have been verified through multiple independent sources.")
+    
+    # Create training dataset
+    X = fake_samples + real_samples
+    y = [0] * len(fake_samples) + [1] * len(real_samples)  # 0 = fake, 1 = real
+    return X, y
+
+
+def preprocess_text(text):
+    """Preprocess text or an AnalysisDocument for analysis"""
+    # Convert to lowercase
+    text = AnalysisDocument.wrap(text).lower
+    
+    # Remove extra whitespace
+    text = re.sub(r'\s+', ' ', text).strip()
+    
+    # Remove URLs
+    text = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', text)
+    
+    return text
+
+
+def build_hashing_vectorizer():
+    """
+    Stateless featurizer for incremental training: terms are hashed into a fixed
+    feature space, so there is no vocabulary to fit and any chunk can be
+    transformed independently
+    """
+    from sklearn.feature_extraction.text import HashingVectorizer
+    
+    return HashingVectorizer(
+        n_features=HASHING_FEATURES,
+        stop_words='english',
+        ngram_range=(1, 2),
+        alternate_sign=False,
+        norm='l2'
+    )
+
+
+class IncrementalTrainer:
+    """
+    Trains partial_fit models chunk by chunk over hashed features, so memory
+    stays flat however many labeled analyses there are. Warm starts continue
+    the latest published incremental bundle and only need the rows added since.
+    """
+    
+    CLASSES = np.array([0, 1])
+    
+    def __init__(self, artifact_dir, warm_start=True, random_state=42):
+        self.artifact_dir = artifact_dir
+        self.vectorizer = build_hashing_vectorizer()
+        self.rows_seen = 0
+        self.last_analysis_id = 0
+        self.base_version = None
+        self._rng = np.random.default_rng(random_state)
+        
+        bundle = None
+        if warm_start:
+            latest = read_latest_version(artifact_dir)
+            if latest:
+                bundle = load_bundle(artifact_dir, latest, mmap_mode=None)
+        
+        if bundle and bundle.get('kind') == 'incremental':
+            self.models = bundle['models']
+            state = bundle.get('training_state') or {}
+            self.rows_seen = state.get('rows_seen', 0)
+            self.last_analysis_id = state.get('last_analysis_id', 0)
+            self.base_version = bundle['version']
+            logging.info(f"Continuing incremental training from version {self.base_version}")
+        else:
+            self.models = self._new_models(random_state)
+            # Seed with the built-in corpus so the models are usable before any labels exist
+            texts, labels = synthetic_training_data()
+            self.partial_fit(texts, labels)
+    
+    @staticmethod
+    def _new_models(random_state):
+        """Unfitted models supporting partial_fit"""
+        from sklearn.linear_model import SGDClassifier
+        from sklearn.naive_bayes import MultinomialNB
+        
+        return {
+            'sgd_logistic': SGDClassifier(loss='log_loss', alpha=1e-5, random_state=random_state),
+            'naive_bayes': MultinomialNB(alpha=0.1),
+        }
+    
+    def partial_fit(self, texts, labels, last_analysis_id=None):
+        """Update every model with one chunk of texts and labels (0 = fake, 1 = real)"""
+        if not len(texts):
+            return
+        
+        labels = np.asarray(labels)
+        # Labeled rows arrive in id order; shuffle within the chunk for SGD
+        order = self._rng.permutation(len(texts))
+        X = self.vectorizer.transform([preprocess_text(texts[i]) for i in order])
+        y = labels[order]
+        
+        for model in self.models.values():
+            model.partial_fit(X, y, classes=self.CLASSES)
+        
+        self.rows_seen += len(texts)
+        if last_analysis_id is not None:
+            self.last_analysis_id = max(self.last_analysis_id, last_analysis_id)
+    
+    def publish(self):
+        """
+        Publish the models as a new version; serving workers pick it up on their
+        next reload check without restarting
+        Returns: str - the published version
+        """
+        return publish_bundle(self.artifact_dir, {
+            'format': ARTIFACT_FORMAT,
+            'version': new_model_version(),
+            'kind': 'incremental',
+            'vectorizer': self.vectorizer,
+            'models': self.models,
+            'compiled_models': compile_models(self.models),
+            'training_state': {
+                'rows_seen': self.rows_seen,
+                'last_analysis_id': self.last_analysis_id,
+                'base_version': self.base_version,
+            },
+        })
+
 
 class FakeNewsDetector:
     """Main fake news detection model using multiple algorithms"""
     
-    def __init__(self):
+    def __init__(self, artifact_dir=None, auto_export=True, cascade_threshold=None,
+                 cascade_models=('logistic', 'sgd_logistic'), use_compiled=True, reload_interval=None):
         self.models = {}
-        self.vectorizer = TfidfVectorizer(
+        self.vectorizer = None
+        
+        # Models used for prediction: compiled flat-array equivalents where
+        # available (use_compiled), otherwise the sklearn models themselves
+        self.use_compiled = use_compiled
+        self.scorers = {}
+        # (vectorizer, scorers) swapped as one reference, so a prediction never
+        # mixes the vectorizer of one version with the models of another
+        self._serving = (None, {})
+        self.artifact_dir = artifact_dir
+        
+        # Check LATEST every reload_interval seconds and hot-swap newly published
+        # versions (None never reloads)
+        self.reload_interval = reload_interval if artifact_dir else None
+        self._next_reload_check = 0.0
+        self.auto_export = auto_export
+        self.model_version = None
+        self.is_trained = False
+        self._loaded = False
+        self._load_lock = threading.Lock()
+        
+        # Cascade: score cascade_models and rules first, and skip the remaining
+        # models when the combined score is at least cascade_threshold away from
+        # 0.5 and both agree. None always runs the full ensemble.
+        self.cascade_threshold = cascade_threshold
+        self.cascade_models = tuple(cascade_models)
+        self.stage_counts = Counter()
+    
+    @property
+    def version(self):
+        """Version of the serving models, loading them if needed"""
+        self._ensure_models()
+        return self.model_version or 'unversioned'
+    
+    def _build_vectorizer(self):
+        """Create an unfitted TF-IDF vectorizer"""
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        
+        return TfidfVectorizer(
             max_features=10000,
             stop_words='english',
             ngram_range=(1, 2),
             min_df=2,
             max_df=0.95
         )
-        self.is_trained = False
+    
+    def _ensure_models(self):
+        """Load the published artifact bundle on first use, training only as a fallback"""
+        if self._loaded:
+            if self.reload_interval is not None and time.monotonic() >= self._next_reload_check:
+                self._reload_if_published()
+            return
+        
+        with self._load_lock:
+            if self._loaded:
+                return
+            
+            if self.artifact_dir:
+                try:
+                    bundle = load_bundle(self.artifact_dir)
+                    if bundle:
+                        self._apply_bundle(bundle)
+                except Exception as e:
+                    logging.error(f"Error loading model artifacts: {str(e)}")
+            
+            if not self.is_trained:
+                logging.warning("No model artifacts found, training models in-process")
+                self._initialize_models()
+                if self.is_trained and self.artifact_dir and self.auto_export:
+                    try:
+                        self.export(self.artifact_dir)
+                    except Exception as e:
+                        logging.warning(f"Could not export model artifacts: {str(e)}")
+            
+            if self.reload_interval is not None:
+                self._next_reload_check = time.monotonic() + self.reload_interval
+            self._loaded = True
+    
+    def _reload_if_published(self):
+        """Swap in a newer published version; requests keep scoring with the old one meanwhile"""
+        # Only one thread checks; the others carry on without waiting
+        if not self._load_lock.acquire(blocking=False):
+            return
+        try:
+            self._next_reload_check = time.monotonic() + self.reload_interval
+            latest = read_latest_version(self.artifact_dir)
+            if latest and latest != self.model_version:
+                bundle = load_bundle(self.artifact_dir, latest)
+                if bundle:
+                    self._apply_bundle(bundle)
+        except Exception as e:
+            logging.error(f"Error reloading model artifacts: {str(e)}")
+        finally:
+            self._load_lock.release()
+    
+    def _apply_bundle(self, bundle):
+        """Swap in the vectorizer and models from a loaded bundle"""
+        self.vectorizer = bundle['vectorizer']
+        self.models = bundle['models']
+        compiled = bundle.get('compiled_models')
+        if compiled is None and self.use_compiled:
+            # Bundles published before compiled models existed
+            compiled = compile_models(self.models)
+        self._set_scorers(compiled or {})
+        self.model_version = bundle['version']
+        self.is_trained = True
+        logging.info(f"Loaded model version {self.model_version}")
+    
+    def _set_scorers(self, compiled):
+        """Predict with compiled models where available, sklearn models otherwise"""
+        compiled = compiled if self.use_compiled else {}
+        self.scorers = {name: compiled.get(name, model) for name, model in self.models.items()}
+        self._serving = (self.vectorizer, self.scorers)
+    
+    def train(self):
+        """Train all models in-process on the built-in corpus"""
         self._initialize_models()
+        self._loaded = True
+        if not self.is_trained:
+            raise RuntimeError("Model training failed")
+    
+    def export(self, artifact_dir):
+        """
+        Publish the trained vectorizer and models as a new versioned bundle
+        Returns: str - the published version
+        """
+        if not self.is_trained:
+            raise RuntimeError("Cannot export untrained models")
+        
+        # The stop word set is only needed for fitting and bloats the bundle
+        self.vectorizer.stop_words_ = None
+        
+        self.model_version = new_model_version()
+        return publish_bundle(artifact_dir, {
+            'format': ARTIFACT_FORMAT,
+            'version': self.model_version,
+            'vectorizer': self.vectorizer,
+            'models': self.models,
+            'compiled_models': compile_models(self.models),
+        })
     
     def _initialize_models(self):
         """Initialize ML models with default training data"""
@@ -40,57 +427,16 @@ class FakeNewsDetector:
     
     def _create_training_data(self):
         """Create training data based on fake news patterns"""
-        # Fake news indicators
-        fake_patterns = [
-            "BREAKING: Shocking truth revealed",
-            "Doctors hate this one simple trick",
-            "You won't believe what happened next",
-            "This will blow your mind",
-            "URGENT: Share before it's deleted",
-            "Secret information they don't want you to know",
-            "Mainstream media won't tell you this",
-            "LEAKED: Confidential documents expose",
-            "EXPOSED: The hidden agenda behind",
-            "BOMBSHELL: Investigation reveals shocking",
-        ]
-        
-        # Real news patterns
-        real_patterns = [
-            "According to a study published in",
-            "Reuters reports that officials confirmed",
-            "The Associated Press has learned that",
-            "Government data shows a trend of",
-            "Research conducted by university scientists",
-            "Official statements from the department",
-            "Investigation by journalists revealed",
-            "Data from the national statistics office",
-            "Peer-reviewed research indicates that",
-            "Official government press release states",
-        ]
-        
-        # Generate training samples
-        fake_samples = []
-        real_samples = []
-        
-        for pattern in fake_patterns:
-            for i in range(20):
-                fake_samples.append(f"{pattern} and many people are concerned about the implications of these findings for the future.")
-        
-        for pattern in real_patterns:
-            for i in range(20):
-                real_samples.append(f"{pattern} and the findings have been verified through multiple independent sources.")
-        
-        # Create training dataset
-        X = fake_samples + real_samples
-        y = [0] * len(fake_samples) + [1] * len(real_samples)  # 0 = fake, 1 = real
-        
-        self.X_train = X
-        self.y_train = y
+        self.X_train, self.y_train = synthetic_training_data()
     
     def _train_models(self):
         """Train multiple ML models"""
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.ensemble import RandomForestClassifier
+        
         try:
             # Vectorize the training data
+            self.vectorizer = self._build_vectorizer()
             X_vectorized = self.vectorizer.fit_transform(self.X_train)
             
             # Train Logistic Regression
@@ -105,6 +451,8 @@ class FakeNewsDetector:
             )
             self.models['random_forest'].fit(X_vectorized, self.y_train)
             
+            self._set_scorers(compile_models(self.models) if self.use_compiled else {})
+            
             logging.info("Models trained successfully")
         except Exception as e:
             logging.error(f"Error training models: {str(e)}")
@@ -112,103 +460,139 @@ class FakeNewsDetector:
     
     def predict_credibility(self, text):
         """
-        Predict credibility score for given text
+        Predict credibility score for given text or AnalysisDocument
         Returns: float between 0 and 1 (0 = likely fake, 1 = likely real)
         """
+        return self.predict_credibility_batch([text])[0]
+    
+    def predict_credibility_batch(self, texts, with_stage=False):
+        """
+        Predict credibility scores for many texts (or AnalysisDocuments) at once,
+        vectorizing the whole batch into one sparse matrix and scoring each model once
+        Returns: list of floats between 0 and 1, in input order, or of
+        (score, stage) tuples when with_stage is set. The stage is 'rules'
+        (rule-based fallback), 'fast' (decided by the cascade's cheap models) or
+        'full' (full ensemble).
+        """
+        self._ensure_models()
+        
+        docs = [AnalysisDocument.wrap(text) for text in texts]
+        if not docs:
+            return []
+        
+        scores, stages = self._predict_batch(docs)
+        self.stage_counts.update(stages)
+        for stage, count in Counter(stages).items():
+            metrics.inc(metrics.SCORED, count, stage=stage)
+        
+        if with_stage:
+            return list(zip(scores, stages))
+        return scores
+    
+    def _predict_batch(self, docs):
+        """Score documents, returning parallel lists of scores and deciding stages"""
+        with metrics.stage('rules'):
+            rule_scores = np.array([self._rule_based_prediction(doc) for doc in docs])
+        rule_result = (rule_scores.tolist(), ['rules'] * len(docs))
+        
         if not self.is_trained:
             logging.warning("Models not trained, using rule-based fallback")
-            return self._rule_based_prediction(text)
+            return rule_result
         
         try:
-            # Preprocess text
-            processed_text = self._preprocess_text(text)
+            # Preprocess and vectorize the whole batch
+            vectorizer, scorers = self._serving
+            with metrics.stage('preprocess'):
+                processed_texts = [self._preprocess_text(doc) for doc in docs]
+            with metrics.stage('vectorize'):
+                X_vectorized = vectorizer.transform(processed_texts)
             
-            # Vectorize input
-            X_vectorized = self.vectorizer.transform([processed_text])
+            cheap_names = []
+            if self.cascade_threshold is not None:
+                cheap_names = [name for name in self.cascade_models if name in scorers]
+            expensive_names = [name for name in scorers if name not in cheap_names]
             
-            # Get predictions from all models
+            # Per-model probabilities of being real; NaN where a model was skipped
             predictions = []
+            stages = np.array(['full'] * len(docs), dtype=object)
             
-            for model_name, model in self.models.items():
-                try:
-                    if hasattr(model, 'predict_proba'):
-                        prob = model.predict_proba(X_vectorized)[0][1]  # Probability of being real
-                        predictions.append(prob)
-                    else:
-                        pred = model.predict(X_vectorized)[0]
-                        predictions.append(float(pred))
-                except Exception as e:
-                    logging.error(f"Error with model {model_name}: {str(e)}")
-                    continue
+            for model_name in cheap_names:
+                probs = self._model_probabilities(model_name, scorers[model_name], X_vectorized)
+                if probs is not None:
+                    predictions.append(probs)
             
-            if not predictions:
-                return self._rule_based_prediction(text)
+            pending = np.arange(len(docs))
+            if predictions and expensive_names:
+                # Early exit where the cheap models and rules agree with enough confidence
+                cheap_ml = np.mean(predictions, axis=0)
+                cheap_scores = 0.7 * cheap_ml + 0.3 * rule_scores
+                agree = (cheap_ml >= 0.5) == (rule_scores >= 0.5)
+                confident = agree & (np.abs(cheap_scores - 0.5) >= self.cascade_threshold)
+                stages[confident] = 'fast'
+                pending = np.flatnonzero(~confident)
+            
+            for model_name in expensive_names:
+                if not len(pending):
+                    break
+                probs = self._model_probabilities(model_name, scorers[model_name], X_vectorized[pending])
+                if probs is not None:
+                    row_probs = np.full(len(docs), np.nan)
+                    row_probs[pending] = probs
+                    predictions.append(row_probs)
             
-            # Average predictions
-            credibility_score = np.mean(predictions)
+            if not predictions:
+                return rule_result
             
-            # Apply rule-based adjustments
-            rule_score = self._rule_based_prediction(text)
+            # Average predictions over the models that scored each row
+            stacked = np.vstack(predictions)
+            scored = ~np.isnan(stacked)
+            has_ml = scored.any(axis=0)
+            credibility_scores = np.where(scored, stacked, 0).sum(axis=0) / np.maximum(scored.sum(axis=0), 1)
             
             # Weighted combination (70% ML, 30% rules)
-            final_score = 0.7 * credibility_score + 0.3 * rule_score
+            final_scores = np.where(has_ml, 0.7 * credibility_scores + 0.3 * rule_scores, rule_scores)
+            stages[~has_ml] = 'rules'
             
-            return float(np.clip(final_score, 0, 1))
+            return np.clip(final_scores, 0, 1).astype(float).tolist(), stages.tolist()
         
         except Exception as e:
             logging.error(f"Prediction error: {str(e)}")
-            return self._rule_based_prediction(text)
+            metrics.inc(metrics.ERRORS, stage='predict')
+            return rule_result
+    
+    def _model_probabilities(self, model_name, model, X_vectorized):
+        """Probability of being real for each row from one model, or None on error"""
+        try:
+            with metrics.timed(metrics.MODEL_SECONDS, error_stage='model', model=model_name):
+                if hasattr(model, 'predict_proba'):
+                    return model.predict_proba(X_vectorized)[:, 1]
+                return model.predict(X_vectorized).astype(float)
+        except Exception as e:
+            logging.error(f"Error with model {model_name}: {str(e)}")
+            return None
     
     def _preprocess_text(self, text):
-        """Preprocess text for analysis"""
-        # Convert to lowercase
-        text = text.lower()
-        
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
-        
-        # Remove URLs
-        text = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', text)
-        
-        return text
+        """Preprocess text or an AnalysisDocument for analysis"""
+        return preprocess_text(text)
     
     def _rule_based_prediction(self, text):
         """Rule-based prediction as fallback"""
+        doc = AnalysisDocument.wrap(text)
         score = 0.5  # Neutral starting score
-        text_lower = text.lower()
+        matches = doc.keyword_matches
         
         # Fake news indicators (decrease score)
-        fake_indicators = [
-            'breaking:', 'urgent:', 'shocking', 'bombshell', 'exposed', 'leaked',
-            'secret', 'hidden truth', 'they don\'t want you to know', 'mainstream media',
-            'wake up', 'sheeple', 'conspiracy', 'cover-up', 'you won\'t believe',
-            'doctors hate', 'one simple trick', 'this will blow your mind'
-        ]
+        score -= len(matches['fake_indicators']) * 0.1
         
         # Real news indicators (increase score)
-        real_indicators = [
-            'according to', 'study shows', 'research indicates', 'data suggests',
-            'reuters', 'associated press', 'government officials', 'peer-reviewed',
-            'university', 'published in', 'sources confirm', 'investigation'
-        ]
-        
-        # Check for fake indicators
-        fake_count = sum(1 for indicator in fake_indicators if indicator in text_lower)
-        score -= fake_count * 0.1
-        
-        # Check for real indicators
-        real_count = sum(1 for indicator in real_indicators if indicator in text_lower)
-        score += real_count * 0.1
+        score += len(matches['real_indicators']) * 0.1
         
         # Excessive punctuation (fake news often uses !!!)
-        exclamation_count = text.count('!')
-        if exclamation_count > 3:
+        if doc.exclamation_count > 3:
             score -= 0.15
         
         # All caps words (often used in fake news)
-        words = text.split()
-        caps_count = sum(1 for word in words if word.isupper() and len(word) > 2)
-        if caps_count > len(words) * 0.1:  # More than 10% caps
+        if doc.caps_word_count > doc.word_count * 0.1:  # More than 10% caps
             score -= 0.1
         
         # Ensure score is within bounds
@@ -1,35 +1,103 @@
 from app import db
 from datetime import datetime
-from sqlalchemy import Text, Float, DateTime, Integer, String
+import hashlib
+import json
+import zlib
+from sqlalchemy import Text, Float, DateTime, Integer, String, LargeBinary, JSON
+from sqlalchemy.orm import query_expression
+
+# Characters of article text kept uncompressed for list views and exports
+PREVIEW_LENGTH = 200
+
+class Article(db.Model):
+    """Article body stored once per distinct text, zlib-compressed and keyed by its SHA-256"""
+    content_hash = db.Column(String(64), primary_key=True)
+    body = db.Column(LargeBinary, nullable=False)
+    length = db.Column(Integer, nullable=False)
+    preview = db.Column(String(PREVIEW_LENGTH + 3), nullable=False)
+    created_at = db.Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<Article {self.content_hash[:12]}>'
+    
+    @staticmethod
+    def hash_content(content):
+        """SHA-256 hex digest identifying identical article text"""
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+    
+    @staticmethod
+    def row_for(content, content_hash=None):
+        """Column values for storing content as an article"""
+        return {
+            'content_hash': content_hash or Article.hash_content(content),
+            'body': zlib.compress(content.encode('utf-8'), 6),
+            'length': len(content),
+            'preview': content[:PREVIEW_LENGTH] + '...' if len(content) > PREVIEW_LENGTH else content,
+            'created_at': datetime.utcnow()
+        }
+    
+    @staticmethod
+    def decompress(body):
+        """Article text from a stored body"""
+        return zlib.decompress(body).decode('utf-8')
+    
+    @property
+    def text(self):
+        """Decompressed article text"""
+        return self.decompress(self.body)
 
 class Analysis(db.Model):
     """Model to store fake news analysis results"""
+    # Keyset pagination of the history list walks this index newest-first
+    __table_args__ = (db.Index('ix_analysis_created_at_id', 'created_at', 'id'),)
+    
     id = db.Column(Integer, primary_key=True)
-    content = db.Column(Text, nullable=False)
+    content_hash = db.Column(String(64), db.ForeignKey('article.content_hash'), index=True)
+    model_version = db.Column(String(64))
     url = db.Column(String(500))
     credibility_score = db.Column(Float, nullable=False)
     is_fake = db.Column(db.Boolean, nullable=False)
     keyword_score = db.Column(Float)
     sentiment_score = db.Column(Float)
     source_score = db.Column(Float)
-    analysis_details = db.Column(Text)
+    analysis_details = db.Column(JSON)
+    # Human-verified verdict used for incremental training: 0 = fake, 1 = real
+    label = db.Column(Integer)
     created_at = db.Column(DateTime, default=datetime.utcnow)
     
+    article = db.relationship('Article')
+    
+    # Article preview, loaded by list queries without fetching the body
+    content_preview = query_expression()
+    
     def __repr__(self):
         return f'<Analysis {self.id}>'
     
+    @property
+    def content(self):
+        """Full article text"""
+        return self.article.text if self.article else ''
+    
+    @property
+    def details(self):
+        """Analysis details dict"""
+        return self.analysis_details or {}
+    
+    hash_content = staticmethod(Article.hash_content)
+    
     def to_dict(self):
         """Convert analysis to dictionary for JSON serialization"""
         return {
             'id': self.id,
-            'content': self.content[:200] + '...' if len(self.content) > 200 else self.content,
+            'content': self.article.preview if self.article else '',
             'url': self.url,
             'credibility_score': self.credibility_score,
             'is_fake': self.is_fake,
             'keyword_score': self.keyword_score,
             'sentiment_score': self.sentiment_score,
             'source_score': self.source_score,
-            'analysis_details': self.analysis_details,
+            'analysis_details': json.dumps(self.analysis_details) if self.analysis_details is not None else None,
+            'label': self.label,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
@@ -39,6 +107,42 @@ class TrustedSource(db.Model):
     domain = db.Column(String(200), unique=True, nullable=False)
     trust_score = db.Column(Float, nullable=False, default=0.5)
     created_at = db.Column(DateTime, default=datetime.utcnow)
+    updated_at = db.Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     def __repr__(self):
         return f'<TrustedSource {self.domain}>'
+
+class AnalysisJob(db.Model):
+    """Queued /analyze work, processed by background workers in any app process"""
+    __table_args__ = (db.Index('ix_analysis_job_status_created_at', 'status', 'created_at'),)
+    
+    id = db.Column(String(32), primary_key=True)
+    status = db.Column(String(16), nullable=False, default='queued')
+    content = db.Column(Text)
+    url = db.Column(String(500))
+    force = db.Column(db.Boolean, nullable=False, default=False)
+    analysis_id = db.Column(Integer, db.ForeignKey('analysis.id'))
+    error = db.Column(Text)
+    created_at = db.Column(DateTime, default=datetime.utcnow)
+    started_at = db.Column(DateTime)
+    finished_at = db.Column(DateTime)
+    # Token of the claim a worker holds on a running job, and the last time it proved it is alive
+    claimed_by = db.Column(String(32))
+    heartbeat_at = db.Column(DateTime)
+    
+    analysis = db.relationship('Analysis')
+    
+    def __repr__(self):
+        return f'<AnalysisJob {self.id} {self.status}>'
+    
+    def to_dict(self):
+        """Convert job status to dictionary for JSON serialization"""
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'analysis': self.analysis.to_dict() if self.analysis else None
+        }
@@ -0,0 +1,77 @@
+import logging
+import os
+import threading
+
+# NLTK resources used by TextAnalyzer and AnalysisDocument -> nltk.data lookup path
+REQUIRED_RESOURCES = {
+    'vader_lexicon': 'sentiment/vader_lexicon.zip',
+    'punkt_tab': 'tokenizers/punkt_tab/english/',
+    'stopwords': 'corpora/stopwords',
+}
+
+_data_path = None
+_available = {}
+_lock = threading.Lock()
+
+def configure(data_path):
+    """
+    Resolve NLTK data from a local directory first. Nothing is downloaded
+    implicitly; use download() (or `flask download-nltk-data`) ahead of time.
+    """
+    global _data_path
+    _data_path = data_path
+    with _lock:
+        _available.clear()
+
+def has_resource(name):
+    """
+    Check once per process whether an NLTK resource is installed, logging a
+    clear error naming the search path when it is missing
+    Returns: bool
+    """
+    if name in _available:
+        return _available[name]
+
+    with _lock:
+        if name in _available:
+            return _available[name]
+
+        try:
+            import nltk
+        except ImportError:
+            logging.error("NLTK is not installed; text features that need it are disabled")
+            _available[name] = False
+            return False
+
+        if _data_path and _data_path not in nltk.data.path:
+            nltk.data.path.insert(0, _data_path)
+
+        try:
+            nltk.data.find(REQUIRED_RESOURCES[name])
+            _available[name] = True
+        except LookupError:
+            logging.error(
+                f"NLTK resource '{name}' not found (searched {', '.join(nltk.data.path)}). "
+                f"Run `flask download-nltk-data` or set NLTK_DATA to a directory containing it; "
+                f"dependent analysis falls back to simpler heuristics."
+            )
+            _available[name] = False
+
+        return _available[name]
+
+def download(data_path=None, names=None):
+    """Download resources into data_path; returns the names that failed"""
+    import nltk
+
+    data_path = data_path or _data_path
+    if data_path:
+        os.makedirs(data_path, exist_ok=True)
+
+    failed = []
+    for name in names or REQUIRED_RESOURCES:
+        if not nltk.download(name, download_dir=data_path, quiet=True, raise_on_error=False):
+            failed.append(name)
+
+    with _lock:
+        _available.clear()
+    return failed
@@ -0,0 +1,118 @@
+import base64
+from datetime import datetime
+from sqlalchemy import select, func, and_, or_, text
+from sqlalchemy.orm import defer, with_expression
+from app import db
+from models import Analysis, Article
+
+class KeysetPage:
+    """One page of analyses, newest first, with cursors for the neighbouring pages"""
+
+    def __init__(self, items, next_cursor=None, prev_cursor=None, total=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.total = total
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+def encode_cursor(analysis):
+    """Opaque cursor for an analysis' position in (created_at, id) order"""
+    raw = f"{analysis.created_at.isoformat()}|{analysis.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """
+    Parse a cursor from encode_cursor
+    Returns: tuple (datetime, int) or None if the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, analysis_id = raw.split('|')
+        return datetime.fromisoformat(created_at), int(analysis_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+# Stored preview of each listed analysis' article, looked up by primary key
+_preview_subquery = (
+    select(Article.preview)
+    .where(Article.content_hash == Analysis.content_hash)
+    .scalar_subquery()
+)
+
+def history_page(after=None, before=None, per_page=10, with_total=True):
+    """
+    Page of analyses ordered by (created_at, id) descending. `after` returns the
+    page following a cursor (older rows) and `before` the page preceding it
+    (newer rows). Each page is an index range scan on ix_analysis_created_at_id
+    with no OFFSET or COUNT(*). Article bodies and details are not loaded; only
+    the stored article preview is.
+    Returns: KeysetPage
+    """
+    position = decode_cursor(before or after) if (before or after) else None
+    backwards = position is not None and bool(before)
+
+    query = (
+        select(Analysis)
+        .options(
+            defer(Analysis.analysis_details),
+            with_expression(Analysis.content_preview, _preview_subquery)
+        )
+        .limit(per_page + 1)
+    )
+
+    if position is not None:
+        created_at, analysis_id = position
+        if backwards:
+            query = query.where(or_(
+                Analysis.created_at > created_at,
+                and_(Analysis.created_at == created_at, Analysis.id > analysis_id)
+            ))
+        else:
+            query = query.where(or_(
+                Analysis.created_at < created_at,
+                and_(Analysis.created_at == created_at, Analysis.id < analysis_id)
+            ))
+
+    if backwards:
+        query = query.order_by(Analysis.created_at.asc(), Analysis.id.asc())
+    else:
+        query = query.order_by(Analysis.created_at.desc(), Analysis.id.desc())
+
+    items = db.session.scalars(query).all()
+    has_more = len(items) > per_page
+    items = items[:per_page]
+    if backwards:
+        items.reverse()
+
+    if backwards:
+        # The page we came from lies after this one
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, position is not None
+
+    next_cursor = encode_cursor(items[-1]) if items and has_next else None
+    prev_cursor = encode_cursor(items[0]) if items and has_prev else None
+
+    return KeysetPage(items, next_cursor, prev_cursor, approximate_total() if with_total else None)
+
+def approximate_total():
+    """
+    Cheap estimate of the number of analyses: the planner's row estimate on
+    PostgreSQL, otherwise the span of primary keys (exact unless rows were deleted)
+    """
+    if db.engine.dialect.name == 'postgresql':
+        estimate = db.session.scalar(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'analysis'::regclass")
+        )
+        if estimate is not None and estimate >= 0:
+            return int(estimate)
+
+    lowest, highest = db.session.execute(select(func.min(Analysis.id), func.max(Analysis.id))).one()
+    return (highest - lowest + 1) if highest is not None else 0
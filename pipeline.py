@@ -0,0 +1,239 @@
+from app import app, db
+from models import Analysis
+from ml_models import FakeNewsDetector
+from text_analyzer import TextAnalyzer
+from url_extractor import URLExtractor
+from http_cache import HTTPCache
+from result_cache import ResultCache
+from analysis_document import AnalysisDocument
+from jobs import JobQueue
+from domain_reputation import DomainReputation
+from article_store import store_articles
+from scoring_executor import ScoringExecutor
+import metrics
+import logging
+from datetime import datetime
+from sqlalchemy import insert
+
+# Initialize components
+detector_options = {
+    'cascade_threshold': app.config['DETECTOR_CASCADE_THRESHOLD'],
+    'reload_interval': app.config['MODEL_RELOAD_INTERVAL'] or None
+}
+detector = FakeNewsDetector(artifact_dir=app.config['MODEL_ARTIFACT_DIR'], **detector_options)
+text_analyzer = TextAnalyzer()
+# Source credibility from the TrustedSource table, with the built-in list as defaults
+domain_reputation = DomainReputation(
+    app,
+    defaults={domain: 0.9 for domain in text_analyzer.trusted_domains},
+    refresh_interval=app.config['DOMAIN_REPUTATION_REFRESH']
+)
+text_analyzer.domain_reputation = domain_reputation
+http_cache = HTTPCache(
+    app.config['HTTP_CACHE_PATH'],
+    max_bytes=app.config['HTTP_CACHE_MAX_BYTES'],
+    ttl=app.config['HTTP_CACHE_TTL'],
+    touch_interval=app.config['HTTP_CACHE_TOUCH_INTERVAL']
+) if app.config['HTTP_CACHE_PATH'] else None
+url_extractor = URLExtractor(
+    max_workers=app.config['FETCH_MAX_WORKERS'],
+    per_host_limit=app.config['FETCH_PER_HOST_LIMIT'],
+    cache=http_cache,
+    max_bytes=app.config['FETCH_MAX_BYTES']
+)
+
+scoring_executor = ScoringExecutor(
+    app.config['MODEL_ARTIFACT_DIR'],
+    processes=app.config['SCORING_PROCESSES'],
+    batch_window=app.config['SCORING_BATCH_WINDOW_MS'] / 1000,
+    max_batch=app.config['SCORING_MAX_BATCH'],
+    detector_options=detector_options,
+    metrics_dir=app.config['METRICS_DIR']
+) if app.config['SCORING_PROCESSES'] > 0 else None
+
+# Shortest content considered reliable enough to analyze
+MIN_CONTENT_LENGTH = 50
+
+# (content hash, model version, url) -> Analysis id
+result_cache = ResultCache(maxsize=app.config['RESULT_CACHE_SIZE'])
+
+def score_texts(texts):
+    """
+    Credibility scores for texts or AnalysisDocuments, computed in the scoring
+    process pool when enabled and in the current thread otherwise
+    Returns: list of (score, stage) tuples in input order
+    """
+    with metrics.stage('score'):
+        if scoring_executor is not None:
+            try:
+                return scoring_executor.score([AnalysisDocument.wrap(text).text for text in texts])
+            except Exception as e:
+                logging.error(f"Scoring pool error, scoring in-process: {str(e)}")
+                metrics.inc(metrics.ERRORS, stage='scoring_pool')
+        return detector.predict_credibility_batch(texts, with_stage=True)
+
+def analyze_submission(content, url=None, force=False):
+    """
+    Analyze a user submission, extracting the article from url when no content
+    is given. Raises ValueError with a user-facing message for unusable input.
+    Returns: tuple (Analysis, dict) - the stored analysis and its details
+    """
+    content = (content or '').strip()
+    url = (url or '').strip()
+
+    if not content and not url:
+        raise ValueError('Please provide either text content or a URL to analyze.')
+
+    if url and not content:
+        with metrics.stage('url_extraction'):
+            content = url_extractor.extract_text(url)
+
+    if len(content) < MIN_CONTENT_LENGTH:
+        raise ValueError(
+            f'Content is too short for reliable analysis. Please provide at least {MIN_CONTENT_LENGTH} characters.'
+        )
+
+    return analyze_content(content, url=url, force=force)
+
+def analyze_content(content, url=None, force=False):
+    """
+    Run the full analysis pipeline on content and store the result. Identical
+    content already analyzed by the serving model version is answered from the
+    stored analysis unless force is set.
+    Returns: tuple (Analysis, dict) - the stored analysis and its details
+    """
+    url = url or None
+    content_hash = Analysis.hash_content(content)
+    model_version = detector.version
+    cache_key = (content_hash, model_version, url)
+
+    if not force:
+        analysis = _find_cached_analysis(cache_key)
+        metrics.inc(metrics.CACHE_LOOKUPS, cache='analysis', result='hit' if analysis is not None else 'miss')
+        if analysis is not None:
+            return analysis, analysis.details
+
+    # One document per request so lowercasing, tokenization and counts are shared
+    doc = AnalysisDocument(content)
+
+    # Get credibility score and detailed analysis
+    credibility_score, scoring_stage = score_texts([doc])[0]
+    row = _analysis_row(doc, content_hash, url, model_version, credibility_score, scoring_stage)
+
+    # Save to database, storing the article body once per distinct text
+    with metrics.stage('db_write'):
+        store_articles({content_hash: content})
+        analysis = Analysis(**row)
+        db.session.add(analysis)
+    with metrics.stage('db_commit'):
+        db.session.commit()
+
+    result_cache.put(cache_key, analysis.id)
+    return analysis, row['analysis_details']
+
+def prepare_analyses(docs, urls, scores):
+    """
+    Analysis column values for already scored documents, computed without
+    touching the database
+    Returns: list of dicts for save_analyses
+    """
+    model_version = detector.version
+    return [
+        _analysis_row(doc, Analysis.hash_content(doc.text), url or None, model_version,
+                      credibility_score, scoring_stage)
+        for doc, url, (credibility_score, scoring_stage) in zip(docs, urls, scores)
+    ]
+
+def save_analyses(texts, rows):
+    """
+    Store prepared analyses with one multi-row INSERT (plus one for their new
+    article bodies) in the current transaction. The caller commits.
+    Returns: list of new Analysis ids in input order
+    """
+    if not rows:
+        return []
+
+    with metrics.stage('db_write'):
+        store_articles({row['content_hash']: text for text, row in zip(texts, rows)})
+        return db.session.scalars(
+            insert(Analysis).returning(Analysis.id, sort_by_parameter_order=True), rows
+        ).all()
+
+def _analysis_row(doc, content_hash, url, model_version, credibility_score, scoring_stage):
+    """Analysis column values, including the details dict, for a scored document"""
+    with metrics.stage('keywords'):
+        keyword_analysis = text_analyzer.analyze_keywords(doc)
+    with metrics.stage('sentiment'):
+        sentiment_analysis = text_analyzer.analyze_sentiment(doc)
+    with metrics.stage('source'):
+        source_analysis = text_analyzer.analyze_source_credibility(url) if url else 0.5
+    with metrics.stage('readability'):
+        readability = text_analyzer.analyze_readability(doc)
+
+    # Create analysis details
+    analysis_details = {
+        'keyword_indicators': keyword_analysis.get('indicators', []),
+        'sentiment': sentiment_analysis.get('sentiment', 'neutral'),
+        'sentiment_confidence': sentiment_analysis.get('confidence', 0),
+        'readability': readability,
+        'length': len(doc.text),
+        'word_count': doc.word_count,
+        'scoring_stage': scoring_stage,
+        'timestamp': datetime.utcnow().isoformat()
+    }
+
+    return {
+        'content_hash': content_hash,
+        'model_version': model_version,
+        'url': url,
+        'credibility_score': credibility_score,
+        'is_fake': credibility_score < 0.5,
+        'keyword_score': keyword_analysis.get('score', 0),
+        'sentiment_score': sentiment_analysis.get('score', 0),
+        'source_score': source_analysis,
+        'analysis_details': analysis_details
+    }
+
+def _find_cached_analysis(cache_key):
+    """Look up a previous analysis in the in-process LRU, then by indexed content hash"""
+    content_hash, model_version, url = cache_key
+
+    analysis_id = result_cache.get(cache_key)
+    if analysis_id is not None:
+        analysis = db.session.get(Analysis, analysis_id)
+        if analysis is not None:
+            return analysis
+        result_cache.discard(cache_key)
+
+    # Another worker may have analyzed it already
+    analysis = Analysis.query.filter_by(
+        content_hash=content_hash, model_version=model_version, url=url
+    ).order_by(Analysis.id.desc()).first()
+
+    if analysis is not None:
+        logging.debug(f"Reusing analysis {analysis.id} for content {content_hash[:12]}")
+        result_cache.put(cache_key, analysis.id)
+    return analysis
+
+def _cache_metrics():
+    """Hit/miss counters of this process's result and HTTP caches, for /metrics"""
+    stats = result_cache.stats()
+    yield metrics.CACHE_LOOKUPS, {'cache': 'result', 'result': 'hit'}, stats['hits']
+    yield metrics.CACHE_LOOKUPS, {'cache': 'result', 'result': 'miss'}, stats['misses']
+    if http_cache is not None:
+        stats = http_cache.counters()
+        for result, counter in (('hit', 'hits'), ('stale', 'stale'), ('miss', 'misses'), ('revalidated', 'revalidated')):
+            yield metrics.CACHE_LOOKUPS, {'cache': 'http', 'result': result}, stats[counter]
+
+metrics.configure(app.config['METRICS_DIR'], flush_interval=app.config['METRICS_FLUSH_INTERVAL'])
+metrics.registry.add_collector(_cache_metrics)
+
+# Background job queue running analyze_submission
+job_queue = JobQueue(
+    app,
+    analyze_submission,
+    workers=app.config['JOB_WORKERS'],
+    max_queued=app.config['JOB_MAX_QUEUED'],
+    stale_after=app.config['JOB_STALE_AFTER'],
+    heartbeat_interval=app.config['JOB_HEARTBEAT_INTERVAL']
+)
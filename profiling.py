@@ -0,0 +1,124 @@
+import cProfile
+import hmac
+import logging
+import os
+import time
+import uuid
+from flask import g, request
+import metrics
+
+# Values of the profiling header: stage timings only, or timings plus a cProfile dump
+MODE_TIMING = 'timing'
+MODE_CPROFILE = 'cprofile'
+
+class RequestProfile:
+    """Timed stages, and optionally a cProfile run, of one opted-in request"""
+
+    def __init__(self, capture_cprofile=False):
+        self.started = time.perf_counter()
+        self.stages = []
+        self.profiler = None
+        self._token = metrics.request_stages.set(self.stages)
+
+        if capture_cprofile:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+                self.profiler = profiler
+            except ValueError as e:
+                # Another profiler is active in this interpreter (Python 3.12+)
+                logging.warning(f"cProfile unavailable for this request: {str(e)}")
+
+    def stop(self):
+        """Stop profiling; safe to call more than once"""
+        if self.profiler is not None:
+            self.profiler.disable()
+        if self._token is not None:
+            metrics.request_stages.reset(self._token)
+            self._token = None
+
+    def server_timing(self):
+        """
+        Stage durations summed by name (stage or model.<name>), slowest first,
+        followed by the total request time
+        Returns: str - Server-Timing header value
+        """
+        totals = {}
+        for (name, labels), seconds in self.stages:
+            labels = dict(labels)
+            if 'stage' in labels:
+                key = labels['stage']
+            elif 'model' in labels:
+                key = f"model.{labels['model']}"
+            else:
+                key = name
+            duration, count = totals.get(key, (0.0, 0))
+            totals[key] = (duration + seconds, count + 1)
+
+        entries = []
+        for key, (duration, count) in sorted(totals.items(), key=lambda item: -item[1][0]):
+            entry = f'{key};dur={duration * 1000:.3f}'
+            if count > 1:
+                entry += f';desc="{count} calls"'
+            entries.append(entry)
+        entries.append(f'total;dur={(time.perf_counter() - self.started) * 1000:.3f}')
+        return ', '.join(entries)
+
+    def dump(self, directory, endpoint):
+        """
+        Write the cProfile stats (readable with pstats or snakeviz)
+        Returns: str - file name, or None when cProfile was not captured
+        """
+        if self.profiler is None:
+            return None
+        os.makedirs(directory, exist_ok=True)
+        filename = f"{time.strftime('%Y%m%d-%H%M%S')}-{endpoint}-{os.getpid()}-{uuid.uuid4().hex[:8]}.prof"
+        self.profiler.dump_stats(os.path.join(directory, filename))
+        return filename
+
+def install(app):
+    """
+    Register the profiling hooks when PROFILING_ENABLED is set. Requests
+    without the PROFILING_HEADER (or with a wrong PROFILING_TOKEN) are not
+    profiled, and with profiling disabled no hook is registered at all.
+    """
+    if not app.config['PROFILING_ENABLED']:
+        return
+
+    metrics.enable_stage_recording()
+    header = app.config['PROFILING_HEADER']
+    token = app.config['PROFILING_TOKEN']
+
+    @app.before_request
+    def start_profile():
+        modes = request.headers.get(header)
+        if not modes:
+            return
+        if token and not hmac.compare_digest(request.headers.get(f'{header}-Token', ''), token):
+            return
+        modes = {mode.strip().lower() for mode in modes.split(',')}
+        g.profile = RequestProfile(capture_cprofile=MODE_CPROFILE in modes)
+
+    @app.after_request
+    def finish_profile(response):
+        profile = g.pop('profile', None)
+        if profile is None:
+            return response
+        profile.stop()
+
+        # Streamed bodies are produced after this point and not included
+        response.headers['Server-Timing'] = profile.server_timing()
+        try:
+            filename = profile.dump(app.config['PROFILE_DIR'], request.endpoint or 'unmatched')
+            if filename:
+                response.headers['X-Profile-File'] = filename
+        except Exception as e:
+            logging.error(f"Profile dump error: {str(e)}")
+        return response
+
+    @app.teardown_request
+    def stop_profile(error=None):
+        # after_request does not run when the view raised
+        profile = g.pop('profile', None)
+        if profile is not None:
+            profile.stop()
@@ -0,0 +1,78 @@
+import json
+import logging
+import os
+from sqlalchemy import select, update, or_
+from app import db
+from models import Analysis, Article
+
+def read_checkpoint(path):
+    """Return the saved checkpoint dict, or None"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def write_checkpoint(path, checkpoint):
+    """Replace the checkpoint file atomically so an interruption never leaves a partial one"""
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+def rescore_analyses(detector, checkpoint_path, chunk_size=500, include_current=False, restart=False):
+    """
+    Recompute credibility_score and is_fake for stored analyses with the
+    detector's model version. Rows are read in id order one chunk at a time
+    and written back with one bulk UPDATE and commit per chunk, after which
+    the checkpoint records the last committed id. A later run with the same
+    model version resumes from there.
+    Yields: dict - progress after each committed chunk
+    """
+    model_version = detector.version
+    checkpoint = None if restart else read_checkpoint(checkpoint_path)
+    if not checkpoint or checkpoint.get('model_version') != model_version:
+        checkpoint = {'model_version': model_version, 'last_id': 0, 'rows': 0}
+    elif checkpoint['last_id']:
+        logging.info(f"Resuming re-scoring for {model_version} after analysis {checkpoint['last_id']}")
+
+    query = (
+        select(Analysis.id, Article.body, Analysis.analysis_details)
+        .join(Article, Analysis.content_hash == Article.content_hash)
+        .order_by(Analysis.id)
+    )
+    if not include_current:
+        query = query.where(or_(Analysis.model_version.is_(None), Analysis.model_version != model_version))
+
+    while True:
+        rows = db.session.execute(
+            query.where(Analysis.id > checkpoint['last_id']).limit(chunk_size)
+        ).all()
+        if not rows:
+            break
+
+        scores = detector.predict_credibility_batch(
+            [Article.decompress(row.body) for row in rows], with_stage=True
+        )
+
+        db.session.execute(update(Analysis), [
+            {
+                'id': row.id,
+                'credibility_score': score,
+                'is_fake': score < 0.5,
+                'model_version': model_version,
+                'analysis_details': _with_stage(row.analysis_details, stage)
+            }
+            for row, (score, stage) in zip(rows, scores)
+        ])
+        db.session.commit()
+
+        checkpoint['last_id'] = rows[-1].id
+        checkpoint['rows'] += len(rows)
+        write_checkpoint(checkpoint_path, checkpoint)
+
+        yield {'model_version': model_version, 'chunk_rows': len(rows), **checkpoint}
+
+def _with_stage(analysis_details, stage):
+    """Copy of analysis_details with scoring_stage replaced"""
+    return {**(analysis_details or {}), 'scoring_stage': stage}
@@ -1,17 +1,14 @@
-from flask import render_template, request, jsonify, flash, redirect, url_for
+from flask import render_template, request, jsonify, flash, redirect, url_for, Response, stream_with_context, g
 from app import app, db
 from models import Analysis, TrustedSource
-from ml_models import FakeNewsDetector
-from text_analyzer import TextAnalyzer
-from url_extractor import URLExtractor
-import logging
+from pipeline import url_extractor, http_cache, job_queue, domain_reputation, analyze_content, score_texts, prepare_analyses, save_analyses
+from analysis_document import AnalysisDocument
+from jobs import QueueFullError
+from pagination import history_page
+import metrics
 import json
-from datetime import datetime
-
-# Initialize components
-detector = FakeNewsDetector()
-text_analyzer = TextAnalyzer()
-url_extractor = URLExtractor()
+import logging
+import time
 
 @app.route('/')
 def index():
@@ -45,42 +42,10 @@ def analyze():
             flash('Content is too short for reliable analysis. Please provide at least 50 characters.', 'error')
             return redirect(url_for('index'))
         
-        # Perform analysis
+        # Perform analysis (reusing a stored result for identical content unless forced)
         try:
-            # Get credibility score and detailed analysis
-            credibility_score = detector.predict_credibility(content)
-            is_fake = credibility_score < 0.5
-            
-            # Get detailed analysis
-            keyword_analysis = text_analyzer.analyze_keywords(content)
-            sentiment_analysis = text_analyzer.analyze_sentiment(content)
-            source_analysis = text_analyzer.analyze_source_credibility(url) if url else 0.5
-            
-            # Create analysis details
-            analysis_details = {
-                'keyword_indicators': keyword_analysis.get('indicators', []),
-                'sentiment': sentiment_analysis.get('sentiment', 'neutral'),
-                'sentiment_confidence': sentiment_analysis.get('confidence', 0),
-                'readability': text_analyzer.analyze_readability(content),
-                'length': len(content),
-                'word_count': len(content.split()),
-                'timestamp': datetime.utcnow().isoformat()
-            }
-            
-            # Save to database
-            analysis = Analysis(
-                content=content,
-                url=url if url else None,
-                credibility_score=credibility_score,
-                is_fake=is_fake,
-                keyword_score=keyword_analysis.get('score', 0),
-                sentiment_score=sentiment_analysis.get('score', 0),
-                source_score=source_analysis,
-                analysis_details=json.dumps(analysis_details)
-            )
-            
-            db.session.add(analysis)
-            db.session.commit()
+            force = request.form.get('force') == '1'
+            analysis, analysis_details = analyze_content(content, url=url, force=force)
             
             return render_template('results.html', 
                                  analysis=analysis,
@@ -100,9 +65,11 @@ def analyze():
 def history():
     """View analysis history"""
     try:
-        page = request.args.get('page', 1, type=int)
-        analyses = Analysis.query.order_by(Analysis.created_at.desc()).paginate(
-            page=page, per_page=10, error_out=False
+        analyses = history_page(
+            after=request.args.get('after'),
+            before=request.args.get('before'),
+            per_page=10,
+            with_total=app.config['HISTORY_APPROX_TOTAL']
         )
         return render_template('history.html', analyses=analyses)
     except Exception as e:
@@ -115,7 +82,7 @@ def view_analysis(analysis_id):
     """View specific analysis details"""
     try:
         analysis = Analysis.query.get_or_404(analysis_id)
-        analysis_details = json.loads(analysis.analysis_details) if analysis.analysis_details else {}
+        analysis_details = analysis.details
         return render_template('results.html', 
                              analysis=analysis,
                              analysis_details=analysis_details)
@@ -134,6 +101,27 @@ def export_analysis(analysis_id):
         logging.error(f"Export error: {str(e)}")
         return jsonify({'error': 'Failed to export analysis'}), 500
 
+@app.route('/analysis/<int:analysis_id>/label', methods=['POST'])
+def label_analysis(analysis_id):
+    """Record a human-verified verdict used by incremental training"""
+    analysis = Analysis.query.get_or_404(analysis_id)
+    try:
+        data = request.get_json(silent=True) or request.form
+        if not hasattr(data, 'get'):
+            return jsonify({'error': 'Request body must be a JSON object or form data'}), 400
+        label = data.get('label')
+
+        labels = {'fake': 0, 'real': 1, None: None}
+        if not (label is None or isinstance(label, str)) or label not in labels:
+            return jsonify({'error': "label must be 'fake', 'real' or null"}), 400
+        
+        analysis.label = labels[label]
+        db.session.commit()
+        return jsonify(analysis.to_dict())
+    except Exception as e:
+        logging.error(f"Label analysis error: {str(e)}")
+        return jsonify({'error': 'Failed to label analysis'}), 500
+
 @app.route('/batch_analyze', methods=['POST'])
 def batch_analyze():
     """Analyze multiple articles at once"""
@@ -144,39 +132,276 @@ def batch_analyze():
         if not articles:
             return jsonify({'error': 'No articles provided'}), 400
         
-        results = []
-        for article in articles[:10]:  # Limit to 10 articles
-            content = article.get('content', '').strip()
-            url = article.get('url', '').strip()
-            
-            if not content and not url:
-                continue
+        max_articles = app.config['BATCH_MAX_ARTICLES']
+        chunk_size = max(1, app.config['BATCH_CHUNK_SIZE'])
+        
+        # Fetch URL-only articles concurrently under an overall deadline
+        articles = [
+            (article.get('content', '').strip(), article.get('url', '').strip())
+            for article in articles[:max_articles]
+        ]
+        extracted = url_extractor.extract_many(
+            [url for content, url in articles if url and not content],
+            deadline=app.config['BATCH_FETCH_DEADLINE']
+        )
+        
+        # Collect analyzable items with whatever content has arrived
+        items = []
+        for content, url in articles:
+            if not content and url:
+                content = extracted.get(url, '')
             
+            if content and len(content.strip()) >= 50:
+                items.append((content, url))
+        
+        # Score in chunks so each model runs once per chunk instead of once per article
+        scored = []
+        for start in range(0, len(items), chunk_size):
+            chunk = items[start:start + chunk_size]
+            docs = [AnalysisDocument(content) for content, _ in chunk]
             try:
-                # Extract content from URL if needed
-                if url and not content:
-                    content = url_extractor.extract_text(url)
-                
-                if content and len(content.strip()) >= 50:
-                    credibility_score = detector.predict_credibility(content)
-                    is_fake = credibility_score < 0.5
-                    
-                    results.append({
-                        'content': content[:200] + '...' if len(content) > 200 else content,
-                        'url': url,
-                        'credibility_score': credibility_score,
-                        'is_fake': is_fake
-                    })
+                scores = score_texts(docs)
             except Exception as e:
-                logging.error(f"Batch analysis item error: {str(e)}")
+                logging.error(f"Batch analysis chunk error: {str(e)}")
                 continue
+            scored.append((chunk, scores, prepare_analyses(docs, [url for _, url in chunk], scores)))
+        
+        # Store everything in one transaction with one bulk INSERT per chunk, after
+        # the CPU-bound work so database locks are held only while writing
+        results = []
+        for chunk, scores, rows in scored:
+            analysis_ids = save_analyses([content for content, _ in chunk], rows)
+            
+            results.extend(
+                _batch_result(content, url, score, analysis_id)
+                for (content, url), score, analysis_id in zip(chunk, scores, analysis_ids)
+            )
+        with metrics.stage('db_commit'):
+            db.session.commit()
         
         return jsonify({'results': results})
     
     except Exception as e:
+        db.session.rollback()
         logging.error(f"Batch analysis error: {str(e)}")
         return jsonify({'error': 'Batch analysis failed'}), 500
 
+@app.route('/batch_analyze/stream', methods=['POST'])
+def batch_analyze_stream():
+    """
+    Analyze newline-delimited JSON articles read from the request body as it
+    arrives, streaming one JSON result line back per article as each chunk
+    completes. Only one chunk is held in memory, whatever the input size.
+    """
+    chunk_size = max(1, app.config['BATCH_CHUNK_SIZE'])
+    max_line_bytes = app.config['BATCH_STREAM_MAX_LINE_BYTES']
+    
+    def generate():
+        counts = {'analyzed': 0, 'errors': 0}
+        chunk = []
+        for line_number, article, error in _read_ndjson(request.stream, max_line_bytes):
+            if error:
+                counts['errors'] += 1
+                yield _ndjson({'line': line_number, 'error': error})
+                continue
+            
+            chunk.append((line_number, (article.get('content') or '').strip(), (article.get('url') or '').strip()))
+            if len(chunk) >= chunk_size:
+                yield from _analyze_stream_chunk(chunk, counts)
+                chunk = []
+        
+        if chunk:
+            yield from _analyze_stream_chunk(chunk, counts)
+        yield _ndjson({'summary': counts})
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+def _read_ndjson(stream, max_line_bytes):
+    """Yield (line number, article dict, error) for each non-empty line of an NDJSON stream"""
+    line_number = 0
+    while True:
+        line = stream.readline(max_line_bytes + 1)
+        if not line:
+            return
+        line_number += 1
+        
+        if len(line) > max_line_bytes:
+            # Discard the rest of an oversized line without buffering it
+            while line and not line.endswith(b'\n'):
+                line = stream.readline(max_line_bytes)
+            yield line_number, None, f'Line exceeds {max_line_bytes} bytes'
+            continue
+        
+        if not line.strip():
+            continue
+        try:
+            article = json.loads(line)
+        except ValueError:
+            yield line_number, None, 'Invalid JSON'
+            continue
+        if not isinstance(article, dict):
+            yield line_number, None, 'Expected a JSON object'
+            continue
+        yield line_number, article, None
+
+def _analyze_stream_chunk(chunk, counts):
+    """Fetch, score and store one chunk of streamed articles, yielding an NDJSON line per article"""
+    try:
+        extracted = url_extractor.extract_many(
+            [url for _, content, url in chunk if url and not content],
+            deadline=app.config['BATCH_FETCH_DEADLINE']
+        )
+    except Exception as e:
+        logging.error(f"Streaming batch fetch error: {str(e)}")
+        extracted = {}
+    
+    # Each line is reported exactly once: rejected here, or below as analyzed or failed
+    items = []
+    for line_number, content, url in chunk:
+        if not content and url:
+            content = extracted.get(url, '')
+        if len(content) < 50:
+            counts['errors'] += 1
+            yield _ndjson({'line': line_number, 'url': url or None,
+                           'error': 'No content, or too short for reliable analysis'})
+            continue
+        items.append((line_number, content, url))
+    
+    if not items:
+        return
+    
+    try:
+        docs = [AnalysisDocument(content) for _, content, _ in items]
+        scores = score_texts(docs)
+        rows = prepare_analyses(docs, [url for _, _, url in items], scores)
+        analysis_ids = save_analyses([content for _, content, _ in items], rows)
+        with metrics.stage('db_commit'):
+            db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logging.error(f"Streaming batch chunk error: {str(e)}")
+        for line_number, _, url in items:
+            counts['errors'] += 1
+            yield _ndjson({'line': line_number, 'url': url or None, 'error': 'Analysis failed'})
+        return
+    
+    for (line_number, content, url), score, analysis_id in zip(items, scores, analysis_ids):
+        counts['analyzed'] += 1
+        yield _ndjson({'line': line_number, **_batch_result(content, url, score, analysis_id)})
+
+def _batch_result(content, url, score, analysis_id):
+    """Batch response entry for one stored analysis"""
+    credibility_score, scoring_stage = score
+    return {
+        'id': analysis_id,
+        'content': content[:200] + '...' if len(content) > 200 else content,
+        'url': url,
+        'credibility_score': credibility_score,
+        'is_fake': credibility_score < 0.5,
+        'scoring_stage': scoring_stage
+    }
+
+def _ndjson(record):
+    return json.dumps(record) + '\n'
+
+@app.before_request
+def start_background_workers():
+    """Start this process's job workers and domain reputation refresh (after any gunicorn fork)"""
+    job_queue.ensure_started()
+    domain_reputation.ensure_started()
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    """Request latency by endpoint and status (streamed bodies are timed until their first byte)"""
+    started = g.pop('request_started', None)
+    if started is not None:
+        metrics.observe(
+            metrics.REQUEST_SECONDS,
+            time.perf_counter() - started,
+            endpoint=request.endpoint or 'unmatched',
+            method=request.method,
+            status=response.status_code
+        )
+    return response
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Stage, model and request latencies, cache and error counters of all processes in Prometheus text format"""
+    gauges = []
+    try:
+        queue = job_queue.gauges()
+        gauges = [
+            ('fakenews_job_queue_depth', 'Analysis jobs waiting to run', {}, queue['queue_depth']),
+            ('fakenews_jobs_running', 'Analysis jobs currently running', {}, queue['running']),
+            ('fakenews_job_oldest_queued_age_seconds', 'Age of the oldest queued job', {},
+             queue['oldest_queued_age_seconds']),
+        ]
+    except Exception as e:
+        logging.error(f"Job metrics error: {str(e)}")
+        db.session.rollback()
+
+    body = metrics.render_prometheus(metrics.registry.collect(), extra_gauges=gauges)
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    """Queue an analysis and return its job id immediately"""
+    try:
+        data = request.get_json(silent=True) or request.form
+        if not hasattr(data, 'get'):
+            return jsonify({'error': 'Request body must be a JSON object or form data'}), 400
+        content = data.get('content') or ''
+        url = data.get('url') or ''
+        if not isinstance(content, str) or not isinstance(url, str):
+            return jsonify({'error': 'content and url must be strings'}), 400
+        content = content.strip()
+        url = url.strip()
+        force = str(data.get('force', '')).lower() in ('1', 'true')
+
+        if not content and not url:
+            return jsonify({'error': 'Provide either content or url'}), 400
+        
+        job = job_queue.submit(content, url=url, force=force)
+        return jsonify({
+            'job_id': job.id,
+            'status': job.status,
+            'status_url': url_for('job_status', job_id=job.id)
+        }), 202
+    
+    except QueueFullError as e:
+        return jsonify({'error': str(e)}), 503
+    except Exception as e:
+        logging.error(f"Job submit error: {str(e)}")
+        return jsonify({'error': 'Failed to queue analysis'}), 500
+
+@app.route('/jobs/metrics')
+def job_metrics():
+    """Queue depth and wait-time metrics for analysis jobs"""
+    try:
+        return jsonify(job_queue.metrics())
+    except Exception as e:
+        logging.error(f"Job metrics error: {str(e)}")
+        return jsonify({'error': 'Failed to load job metrics'}), 500
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Status of a queued analysis, with the resulting Analysis once done"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/cache/stats')
+def cache_stats():
+    """HTTP cache hit/miss counters for this worker"""
+    if not http_cache:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, **http_cache.stats()})
+
 @app.errorhandler(404)
 def not_found(error):
     return render_template('index.html'), 404
@@ -0,0 +1,153 @@
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import metrics
+from ml_models import FakeNewsDetector
+
+# Detector owned by each pool process, loaded once by _init_worker
+_worker_detector = None
+
+def _init_worker(artifact_dir, detector_options, metrics_dir=None):
+    """Load the published model bundle once per pool process"""
+    global _worker_detector
+    metrics.configure(metrics_dir)
+    _worker_detector = FakeNewsDetector(artifact_dir=artifact_dir, auto_export=False, **detector_options)
+    _worker_detector._ensure_models()
+
+def _score_batch(texts):
+    """Score a batch of texts in a pool process, returning (score, stage) tuples"""
+    return _worker_detector.predict_credibility_batch(texts, with_stage=True)
+
+class ScoringExecutor:
+    """
+    Process pool for CPU-bound credibility scoring. Single texts submitted from
+    request threads are coalesced into batches for up to batch_window seconds
+    (or max_batch texts) before being sent to a pool process, so concurrent
+    requests share one vectorizer/model call and scale across cores.
+    """
+
+    def __init__(self, artifact_dir, processes=None, batch_window=0.005, max_batch=64, timeout=30,
+                 detector_options=None, metrics_dir=None):
+        self.artifact_dir = artifact_dir
+        self.detector_options = detector_options or {}
+        self.metrics_dir = metrics_dir
+        self.processes = processes or os.cpu_count()
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.timeout = timeout
+
+        self._pool = None
+        self._pid = None
+        self._pending = queue.Queue()
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        """Create the coalescing thread once per process (after any fork) and the pool on demand"""
+        if self._pid == os.getpid() and self._pool is not None:
+            return self._pool
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pool = None
+                self._pending = queue.Queue()
+                threading.Thread(target=self._coalesce_loop, name='scoring-coalescer', daemon=True).start()
+                self._pid = os.getpid()
+            if self._pool is None:
+                # Spawned children avoid forking a multi-threaded server process
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                    initargs=(self.artifact_dir, self.detector_options, self.metrics_dir)
+                )
+                logging.info(f"Started scoring pool with {self.processes} processes")
+            return self._pool
+
+    def _reset_pool(self):
+        """Drop a broken pool so the next call starts a fresh one"""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def submit(self, text):
+        """
+        Queue one text for coalesced scoring
+        Returns: Future resolving to a (score, stage) tuple
+        """
+        self._ensure_started()
+        future = Future()
+        self._pending.put((text, future))
+        return future
+
+    def score(self, texts):
+        """
+        Score texts across the pool, sending batches of up to max_batch texts
+        to different processes in parallel
+        Returns: list of (score, stage) tuples in input order
+        """
+        texts = list(texts)
+        if len(texts) == 1:
+            return [self.submit(texts[0]).result(timeout=self.timeout)]
+
+        pool = self._ensure_started()
+        try:
+            futures = [
+                pool.submit(_score_batch, texts[start:start + self.max_batch])
+                for start in range(0, len(texts), self.max_batch)
+            ]
+            scores = []
+            for future in futures:
+                scores.extend(future.result(timeout=self.timeout))
+            return scores
+        except BrokenProcessPool:
+            self._reset_pool()
+            raise
+
+    def _coalesce_loop(self):
+        """Gather queued texts into batches and dispatch them to the pool"""
+        pending = self._pending
+        while True:
+            batch = [pending.get()]
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._dispatch(batch)
+
+    def _dispatch(self, batch):
+        """Submit a coalesced batch and resolve each caller's future when it completes"""
+        futures = [future for _, future in batch]
+        try:
+            pool_future = self._ensure_started().submit(_score_batch, [text for text, _ in batch])
+        except Exception as e:
+            logging.error(f"Scoring pool submit error: {str(e)}")
+            if isinstance(e, BrokenProcessPool):
+                self._reset_pool()
+            for future in futures:
+                future.set_exception(e)
+            return
+
+        def resolve(done):
+            try:
+                scores = done.result()
+            except Exception as e:
+                logging.error(f"Scoring pool batch error: {str(e)}")
+                if isinstance(e, BrokenProcessPool):
+                    self._reset_pool()
+                for future in futures:
+                    future.set_exception(e)
+                return
+            for future, score in zip(futures, scores):
+                future.set_result(score)
+
+        pool_future.add_done_callback(resolve)
@@ -1,47 +1,27 @@
 import re
-import nltk
 from collections import Counter
+from functools import cached_property
 from urllib.parse import urlparse
+from keyword_matcher import INDICATOR_SETS
+from analysis_document import AnalysisDocument
+from domain_index import DomainIndex
+import nltk_resources
+import metrics
 import logging
 
-# Download required NLTK data
-try:
-    nltk.download('vader_lexicon', quiet=True)
-    nltk.download('punkt', quiet=True)
-    nltk.download('stopwords', quiet=True)
-    from nltk.sentiment.vader import SentimentIntensityAnalyzer
-    from nltk.corpus import stopwords
-    from nltk.tokenize import word_tokenize, sent_tokenize
-except Exception as e:
-    logging.warning(f"NLTK download error: {str(e)}")
-
 class TextAnalyzer:
     """Analyze text for various features related to fake news detection"""
     
-    def __init__(self):
-        try:
-            self.sentiment_analyzer = SentimentIntensityAnalyzer()
-            self.stop_words = set(stopwords.words('english'))
-        except:
-            self.sentiment_analyzer = None
-            self.stop_words = set()
-        
-        # Common fake news keywords and patterns
-        self.fake_keywords = [
-            'breaking', 'urgent', 'shocking', 'bombshell', 'exposed', 'leaked',
-            'secret', 'hidden', 'conspiracy', 'cover-up', 'mainstream media',
-            'deep state', 'fake news', 'hoax', 'scam', 'lies', 'deception',
-            'you won\'t believe', 'doctors hate', 'one simple trick',
-            'this will blow your mind', 'they don\'t want you to know'
-        ]
-        
-        # Credible source indicators
-        self.credible_keywords = [
-            'study', 'research', 'according to', 'data shows', 'evidence',
-            'peer-reviewed', 'university', 'institution', 'official',
-            'government', 'reuters', 'associated press', 'published',
-            'journal', 'investigation', 'verified', 'confirmed'
-        ]
+    # Domain names containing any of these are treated as unreliable
+    UNRELIABLE_PATTERN = re.compile(
+        'blogspot|wordpress|tumblr|medium|fake|hoax|conspiracy|truth|patriot|freedom|liberty'
+    )
+    
+    def __init__(self, domain_reputation=None):
+        # Fake news and credible source keywords, matched in one pass by the shared
+        # matcher through AnalysisDocument.keyword_matches
+        self.fake_keywords = INDICATOR_SETS['fake_keywords']
+        self.credible_keywords = INDICATOR_SETS['credible_keywords']
         
         # Trusted news domains
         self.trusted_domains = [
@@ -49,17 +29,45 @@ class TextAnalyzer:
             'washingtonpost.com', 'theguardian.com', 'wsj.com', 'npr.org',
             'abc.com', 'cbsnews.com', 'nbcnews.com', 'usatoday.com'
         ]
+        
+        # Source lookups go through domain_reputation (anything with lookup(host),
+        # e.g. a DomainReputation backed by TrustedSource), defaulting to the list above
+        self.domain_reputation = domain_reputation or DomainIndex(
+            {domain: 0.9 for domain in self.trusted_domains}
+        )
+    
+    @cached_property
+    def sentiment_analyzer(self):
+        """VADER analyzer, loaded on first use (None if the lexicon is unavailable)"""
+        if not nltk_resources.has_resource('vader_lexicon'):
+            return None
+        try:
+            from nltk.sentiment.vader import SentimentIntensityAnalyzer
+            return SentimentIntensityAnalyzer()
+        except Exception as e:
+            logging.error(f"Sentiment analyzer load error: {str(e)}")
+            return None
+    
+    @cached_property
+    def stop_words(self):
+        """English stop words, loaded on first use (empty if unavailable)"""
+        if not nltk_resources.has_resource('stopwords'):
+            return set()
+        from nltk.corpus import stopwords
+        return set(stopwords.words('english'))
     
     def analyze_keywords(self, text):
-        """Analyze text for fake news keywords"""
+        """Analyze text (or an AnalysisDocument) for fake news keywords"""
         try:
-            text_lower = text.lower()
+            doc = AnalysisDocument.wrap(text)
+            matches = doc.keyword_matches
             
-            # Count fake news indicators
-            fake_count = sum(1 for keyword in self.fake_keywords if keyword in text_lower)
+            # Find specific indicators present
+            fake_indicators = matches['fake_keywords']
+            credible_indicators = matches['credible_keywords']
             
-            # Count credible indicators
-            credible_count = sum(1 for keyword in self.credible_keywords if keyword in text_lower)
+            fake_count = len(fake_indicators)
+            credible_count = len(credible_indicators)
             
             # Calculate score (higher = more credible)
             total_indicators = fake_count + credible_count
@@ -68,10 +76,6 @@ class TextAnalyzer:
             else:
                 score = credible_count / total_indicators
             
-            # Find specific indicators present
-            fake_indicators = [kw for kw in self.fake_keywords if kw in text_lower]
-            credible_indicators = [kw for kw in self.credible_keywords if kw in text_lower]
-            
             return {
                 'score': score,
                 'fake_indicators': fake_indicators,
@@ -81,6 +85,7 @@ class TextAnalyzer:
         
         except Exception as e:
             logging.error(f"Keyword analysis error: {str(e)}")
+            metrics.inc(metrics.ERRORS, stage='keywords')
             return {'score': 0.5, 'fake_indicators': [], 'credible_indicators': [], 'indicators': []}
     
     def analyze_sentiment(self, text):
@@ -89,7 +94,7 @@ class TextAnalyzer:
             if not self.sentiment_analyzer:
                 return {'sentiment': 'neutral', 'score': 0.5, 'confidence': 0}
             
-            scores = self.sentiment_analyzer.polarity_scores(text)
+            scores = self.sentiment_analyzer.polarity_scores(AnalysisDocument.wrap(text).text)
             
             # Determine sentiment
             if scores['compound'] >= 0.05:
@@ -111,14 +116,18 @@ class TextAnalyzer:
         
         except Exception as e:
             logging.error(f"Sentiment analysis error: {str(e)}")
+            metrics.inc(metrics.ERRORS, stage='sentiment')
             return {'sentiment': 'neutral', 'score': 0.5, 'confidence': 0}
     
     def analyze_readability(self, text):
         """Analyze readability and writing quality"""
         try:
+            doc = AnalysisDocument.wrap(text)
+            text = doc.text
+            
             # Basic readability metrics
-            sentences = sent_tokenize(text) if 'sent_tokenize' in globals() else text.split('.')
-            words = word_tokenize(text) if 'word_tokenize' in globals() else text.split()
+            sentences = doc.sentences
+            words = doc.tokens
             
             # Remove empty sentences
             sentences = [s.strip() for s in sentences if s.strip()]
@@ -131,9 +140,9 @@ class TextAnalyzer:
             avg_word_length = sum(len(word) for word in words) / len(words)
             
             # Count complex patterns
-            exclamation_count = text.count('!')
-            question_count = text.count('?')
-            caps_words = sum(1 for word in words if word.isupper() and len(word) > 2)
+            exclamation_count = doc.exclamation_count
+            question_count = doc.question_count
+            caps_words = doc.caps_token_count
             
             # Calculate readability score (0-1, higher = better)
             score = 0.5
@@ -164,6 +173,7 @@ class TextAnalyzer:
         
         except Exception as e:
             logging.error(f"Readability analysis error: {str(e)}")
+            metrics.inc(metrics.ERRORS, stage='readability')
             return {'score': 0.5, 'details': 'Analysis failed'}
     
     def analyze_source_credibility(self, url):
@@ -173,20 +183,15 @@ class TextAnalyzer:
                 return 0.5
             
             parsed_url = urlparse(url.lower())
-            domain = parsed_url.netloc.replace('www.', '')
+            domain = (parsed_url.hostname or '').rstrip('.')
             
-            # Check against trusted domains
-            if domain in self.trusted_domains:
-                return 0.9
+            # Listed domains, including their subdomains
+            reputation = self.domain_reputation.lookup(domain)
+            if reputation is not None:
+                return reputation
             
             # Check for common unreliable patterns
-            unreliable_patterns = [
-                'blogspot', 'wordpress', 'tumblr', 'medium',
-                'fake', 'hoax', 'conspiracy', 'truth',
-                'patriot', 'freedom', 'liberty'
-            ]
-            
-            if any(pattern in domain for pattern in unreliable_patterns):
+            if self.UNRELIABLE_PATTERN.search(domain):
                 return 0.2
             
             # Check TLD credibility
@@ -199,6 +204,7 @@ class TextAnalyzer:
         
         except Exception as e:
             logging.error(f"Source credibility analysis error: {str(e)}")
+            metrics.inc(metrics.ERRORS, stage='source')
             return 0.5
     
     def extract_entities(self, text):
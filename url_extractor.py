@@ -1,19 +1,121 @@
 import requests
-import trafilatura
+from requests.adapters import HTTPAdapter
 from urllib.parse import urlparse, urljoin
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from functools import cached_property
 import logging
+import os
+import threading
 import time
+import metrics
+
+# Content types parsed as pages; anything else (PDFs, images, video) is rejected
+# from the response headers before the body is downloaded
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml', 'text/xml', 'application/xml')
+
+# Most bytes taken per read while streaming a response body; each read returns
+# whatever one socket read delivered, so a slow server cannot stretch it
+DOWNLOAD_CHUNK_SIZE = 16 * 1024
+
+def _iter_body(response):
+    """
+    Yield a streamed response's decoded body as it arrives. With urllib3 2.2+
+    each piece comes from a single socket read, so a server dripping bytes
+    hands control back after every read instead of filling a whole chunk.
+    """
+    read1 = getattr(response.raw, 'read1', None)
+    if read1 is None:
+        yield from response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE)
+        return
+    while True:
+        chunk = read1(DOWNLOAD_CHUNK_SIZE, decode_content=True)
+        if not chunk:
+            return
+        yield chunk
+
+class UnsupportedContentError(ValueError):
+    """The URL returned something other than an HTML page"""
+
+class DownloadTooLargeError(ValueError):
+    """The response body exceeds the extractor's max_bytes"""
+
+def make_soup(content, parse_only=None):
+    """BeautifulSoup tree built with lxml, or the pure-Python html.parser if lxml is missing"""
+    from bs4 import BeautifulSoup, FeatureNotFound
+    
+    try:
+        return BeautifulSoup(content, 'lxml', parse_only=parse_only)
+    except FeatureNotFound:
+        return BeautifulSoup(content, 'html.parser', parse_only=parse_only)
+
+class FetchedDocument:
+    """A page downloaded once, with text, metadata and domain info derived lazily from its bytes"""
+    
+    def __init__(self, url, content, extractor, content_type=''):
+        self.url = url
+        self.content = content
+        self.content_type = content_type
+        self._extractor = extractor
+    
+    @cached_property
+    def text(self):
+        """Main text via trafilatura, falling back to BeautifulSoup"""
+        import trafilatura
+        
+        with metrics.stage('extract'):
+            text = trafilatura.extract(self.content)
+            if not text:
+                text = self.fallback_text
+        return text or ''
+    
+    @cached_property
+    def fallback_text(self):
+        """Main text via BeautifulSoup content selectors"""
+        return self._extractor._extract_with_beautifulsoup(self.content)
+    
+    @cached_property
+    def metadata(self):
+        """Title, description, author etc. via trafilatura, falling back to meta tags"""
+        with metrics.stage('metadata'):
+            return self._extractor._extract_metadata(self.content, self.url)
+    
+    @cached_property
+    def domain_info(self):
+        """Domain breakdown of the document URL"""
+        return self._extractor.get_domain_info(self.url)
 
 class URLExtractor:
     """Extract and analyze content from URLs"""
     
-    def __init__(self):
+    def __init__(self, max_workers=8, per_host_limit=2, cache=None, max_bytes=5 * 1024 * 1024):
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
         self.timeout = 10
+        
+        # Largest (decompressed) page body downloaded before giving up
+        self.max_bytes = max_bytes
+        
+        # Optional HTTPCache for downloaded pages
+        self.cache = cache
+        
+        # Concurrency limits for extract_many. One executor is shared by every
+        # batch in the process, so max_workers caps concurrent fetches overall
+        # rather than per request
+        self.max_workers = max_workers
+        self._executor = None
+        self._executor_pid = None
+        self.per_host_limit = per_host_limit
+        # host -> [semaphore, fetches waiting for or holding it]; an entry is
+        # dropped when its last fetch finishes, so the dict only holds active hosts
+        self._host_semaphores = {}
+        self._host_lock = threading.Lock()
+        
+        # Size the connection pool so concurrent fetches can reuse connections
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
     
     def extract_text(self, url):
         """
@@ -25,15 +127,8 @@ class URLExtractor:
             if not self._is_valid_url(url):
                 raise ValueError("Invalid URL format")
             
-            # Use trafilatura for better content extraction
-            downloaded = trafilatura.fetch_url(url)
-            if not downloaded:
-                raise ValueError("Failed to download content from URL")
-            
-            text = trafilatura.extract(downloaded)
-            if not text:
-                # Fallback to BeautifulSoup if trafilatura fails
-                text = self._extract_with_beautifulsoup(url)
+            # Download once; trafilatura extraction falls back to BeautifulSoup
+            text = self.fetch_document(url).text
             
             if not text or len(text.strip()) < 50:
                 raise ValueError("Insufficient content extracted from URL")
@@ -44,13 +139,177 @@ class URLExtractor:
             logging.error(f"URL extraction error for {url}: {str(e)}")
             raise
     
-    def _extract_with_beautifulsoup(self, url):
-        """Fallback extraction method using BeautifulSoup"""
+    def fetch_document(self, url):
+        """
+        Download a page once through the pooled session, serving it from the
+        HTTP cache when fresh and revalidating stale entries conditionally.
+        Bodies are streamed and capped at max_bytes; non-HTML responses are
+        rejected before their body is read.
+        Returns: FetchedDocument - lazily derives text, metadata and domain info
+        """
+        cached = self.cache.get(url) if self.cache else None
+        if cached and cached.is_fresh:
+            return FetchedDocument(url, cached.body, self, content_type=cached.content_type)
+        
+        headers = {}
+        if cached:
+            if cached.etag:
+                headers['If-None-Match'] = cached.etag
+            if cached.last_modified:
+                headers['If-Modified-Since'] = cached.last_modified
+        
+        with metrics.stage('fetch'):
+            response = self.session.get(url, headers=headers, timeout=self.timeout, stream=True)
+            try:
+                # Unchanged since we cached it: the server sent no body
+                if cached and response.status_code == 304:
+                    self.cache.refresh(url)
+                    return FetchedDocument(url, cached.body, self, content_type=cached.content_type)
+                
+                response.raise_for_status()
+                content_type = response.headers.get('content-type', '')
+                content = self._read_body(response, content_type)
+            finally:
+                response.close()
+        
+        if not content:
+            raise ValueError("Failed to download content from URL")
+        
+        if self.cache and 'no-store' not in response.headers.get('cache-control', ''):
+            self.cache.put(
+                url,
+                content,
+                content_type=content_type,
+                etag=response.headers.get('etag'),
+                last_modified=response.headers.get('last-modified')
+            )
+        
+        return FetchedDocument(url, content, self, content_type=content_type)
+    
+    def _read_body(self, response, content_type):
+        """
+        Stream a response body, rejecting non-HTML content types from the
+        headers and stopping as soon as the body exceeds max_bytes or the
+        download takes longer than the timeout
+        Returns: bytes
+        """
+        media_type = content_type.split(';')[0].strip().lower()
+        if media_type and media_type not in HTML_CONTENT_TYPES:
+            metrics.inc(metrics.ERRORS, stage='fetch_content_type')
+            raise UnsupportedContentError(f"Unsupported content type: {media_type}")
+        
+        declared_length = response.headers.get('content-length', '')
+        if declared_length.isdigit() and int(declared_length) > self.max_bytes:
+            metrics.inc(metrics.ERRORS, stage='fetch_too_large')
+            raise DownloadTooLargeError(f"Page is {declared_length} bytes, limit is {self.max_bytes}")
+        
+        # Counts decompressed bytes, so compressed bodies cannot expand past the limit either
+        chunks = []
+        size = 0
+        deadline = time.monotonic() + self.timeout
+        for chunk in _iter_body(response):
+            if time.monotonic() > deadline:
+                raise requests.exceptions.Timeout(f"Download took longer than {self.timeout}s")
+            size += len(chunk)
+            if size > self.max_bytes:
+                metrics.inc(metrics.ERRORS, stage='fetch_too_large')
+                raise DownloadTooLargeError(f"Page exceeds the {self.max_bytes} byte limit")
+            chunks.append(chunk)
+        return b''.join(chunks)
+    
+    def extract_many(self, urls, deadline=30):
+        """
+        Extract text from many URLs concurrently, capping concurrency across
+        all concurrent calls (max_workers) and per host (per_host_limit). URLs
+        that fail or are still pending when the overall deadline (seconds)
+        expires are left out.
+        Returns: dict - url -> extracted text
+        """
+        results = {}
+        unique_urls = list(dict.fromkeys(url for url in urls if url))
+        if not unique_urls:
+            return results
+        
+        expires_at = time.monotonic() + deadline
+        executor = self._shared_executor()
+        futures = {
+            executor.submit(self._extract_with_host_limit, url, expires_at): url
+            for url in unique_urls
+        }
+        
+        try:
+            for future in as_completed(futures, timeout=deadline):
+                url = futures[future]
+                try:
+                    results[url] = future.result()
+                except Exception as e:
+                    logging.warning(f"Concurrent extraction failed for {url}: {str(e)}")
+        except FuturesTimeoutError:
+            logging.warning(
+                f"Batch extraction deadline of {deadline}s reached with "
+                f"{sum(1 for f in futures if not f.done())} URLs still pending"
+            )
+        finally:
+            # Drop this batch's queued URLs; running stragglers finish in the
+            # background and are discarded
+            for future in futures:
+                future.cancel()
+        
+        return results
+    
+    def _shared_executor(self):
+        """
+        The thread pool shared by all extract_many calls, created once per
+        process (worker threads do not survive a gunicorn fork)
+        Returns: ThreadPoolExecutor
+        """
+        with self._host_lock:
+            if self._executor_pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='url-extract')
+                self._executor_pid = os.getpid()
+            return self._executor
+    
+    def _extract_with_host_limit(self, url, expires_at):
+        """Run extract_text while holding a slot of the URL's per-host semaphore"""
+        host = urlparse(url).netloc.lower()
+        semaphore = self._acquire_host_entry(host)
         try:
-            response = self.session.get(url, timeout=self.timeout)
-            response.raise_for_status()
+            remaining = expires_at - time.monotonic()
+            if remaining <= 0 or not semaphore.acquire(timeout=remaining):
+                raise TimeoutError("Deadline reached while waiting for a host slot")
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            try:
+                return self.extract_text(url)
+            finally:
+                semaphore.release()
+        finally:
+            self._release_host_entry(host)
+    
+    def _acquire_host_entry(self, host):
+        """
+        Get or create the semaphore limiting concurrent fetches to a host and
+        register the caller as one of its users
+        Returns: threading.BoundedSemaphore
+        """
+        with self._host_lock:
+            entry = self._host_semaphores.get(host)
+            if entry is None:
+                entry = self._host_semaphores[host] = [threading.BoundedSemaphore(self.per_host_limit), 0]
+            entry[1] += 1
+            return entry[0]
+    
+    def _release_host_entry(self, host):
+        """Unregister a user of the host's semaphore, dropping it once nobody waits for or holds it"""
+        with self._host_lock:
+            entry = self._host_semaphores[host]
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._host_semaphores[host]
+    
+    def _extract_with_beautifulsoup(self, content):
+        """Fallback extraction method using BeautifulSoup"""
+        try:
+            soup = make_soup(content)
             
             # Remove script and style elements
             for script in soup(["script", "style", "nav", "header", "footer", "aside"]):
@@ -87,12 +346,18 @@ class URLExtractor:
     def extract_metadata(self, url):
         """Extract metadata from URL (title, description, etc.)"""
         try:
-            # Use trafilatura for metadata extraction
-            downloaded = trafilatura.fetch_url(url)
-            if not downloaded:
-                return {}
+            return self.fetch_document(url).metadata
+        except Exception as e:
+            logging.error(f"Metadata extraction error: {str(e)}")
+            return {}
+    
+    def _extract_metadata(self, content, url):
+        """Extract metadata from downloaded page content"""
+        try:
+            import trafilatura
             
-            metadata = trafilatura.extract_metadata(downloaded)
+            # Use trafilatura for metadata extraction
+            metadata = trafilatura.extract_metadata(content, default_url=url)
             
             result = {}
             if metadata:
@@ -105,7 +370,7 @@ class URLExtractor:
             
             # Fallback to manual extraction if needed
             if not result.get('title'):
-                result.update(self._extract_metadata_manual(url))
+                result.update(self._extract_metadata_manual(content))
             
             return result
         
@@ -113,13 +378,13 @@ class URLExtractor:
             logging.error(f"Metadata extraction error: {str(e)}")
             return {}
     
-    def _extract_metadata_manual(self, url):
+    def _extract_metadata_manual(self, content):
         """Manual metadata extraction using BeautifulSoup"""
         try:
-            response = self.session.get(url, timeout=self.timeout)
-            response.raise_for_status()
+            from bs4 import SoupStrainer
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            # Only the title and meta tags are built into the tree
+            soup = make_soup(content, parse_only=SoupStrainer(['title', 'meta']))
             metadata = {}
             
             # Extract title